@@ -0,0 +1,33 @@
+"""
+Cold import time of the H2S modules, every import timed in a fresh interpreter.
+
+python examples/cold_import.py [runs]
+"""
+
+import os
+import sys
+import subprocess
+import time
+
+MODULES = ["H2S", "H2S.h2s", "H2S.scraper", "H2S.corpus", "H2S.mimes"]
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def cold(module: str, runs: int) -> float:
+    """Best wall time of "import module" minus the bare interpreter start, in milliseconds."""
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    best = {}
+    for code in ("pass", f"import {module}"):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], env=env, check=True)
+            times.append(time.perf_counter() - start)
+        best[code] = min(times)
+    return (best[f"import {module}"] - best["pass"]) * 1000
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for module in MODULES:
+        print(f"{module:<14} {cold(module, runs):7.1f} ms")
@@ -0,0 +1,74 @@
+"""
+H2S - parser and extractor for HAR (http archive) files.
+
+The names below are imported from their modules the first time they are
+used, so "import H2S" stays cheap for short lived scripts that may never
+open a file (see examples/cold_import.py).
+
+Examples:-
+>> import H2S
+>> x = H2S.Har("./test.har")
+>> for filename, summary in H2S.load_many(files):
+>>     ...
+"""
+
+from importlib import import_module
+
+# typing alone costs more import time than the rest of this file, type
+# checkers treat a TYPE_CHECKING constant the same as typing.TYPE_CHECKING
+TYPE_CHECKING = False
+
+_EXPORTS = {
+    "Har": "h2s",
+    "HarStream": "h2s",
+    "Entries": "h2s",
+    "DecodeLimits": "decoders",
+    "DecodeError": "decoders",
+    "LimitExceeded": "decoders",
+    "BodyStore": "store",
+    "StringTable": "strings",
+    "EntryIndex": "sidecar",
+    "EntryTable": "table",
+    "TimingStats": "analytics",
+    "PageStats": "analytics",
+    "Lookup": "query",
+    "BodyIndex": "search",
+    "Matcher": "search",
+    "HarCorpus": "corpus",
+    "HarSummary": "corpus",
+    "load_many": "corpus",
+    "HarWriter": "writer",
+    "split": "partition",
+    "shard": "partition",
+    "merge": "partition",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .analytics import PageStats, TimingStats
+    from .corpus import HarCorpus, HarSummary, load_many
+    from .decoders import DecodeError, DecodeLimits, LimitExceeded
+    from .h2s import Entries, Har, HarStream
+    from .query import Lookup
+    from .search import BodyIndex, Matcher
+    from .sidecar import EntryIndex
+    from .store import BodyStore
+    from .strings import StringTable
+    from .table import EntryTable
+    from .partition import merge, shard, split
+    from .writer import HarWriter
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    # later lookups find it in the module dict and never get here
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
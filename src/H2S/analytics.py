@@ -0,0 +1,286 @@
+"""
+Timing analytics over a whole capture.
+
+The timings phases of every entry are held as columns (one array per phase,
+NaN where the phase is missing or -1, "does not apply" in the spec) and
+summed, percentiled and histogrammed per group of entries in one go: with
+NumPy the groups are reduced with bincount / lexsort instead of a loop over
+entries, without it the same results come from plain Python.
+
+Groups are "host" (of the request url), "category" (top level mime type,
+see H2S.mimes), "status" and "page" (pageref); None groups the whole capture.
+
+PageStats aggregates the entries of every page the same way (request count,
+bytes, onContentLoad/onLoad, time to last byte).
+
+Examples:-
+>> stats = Har("./test.har").timing_stats()
+>> stats.percentiles("wait", by="host")          # {host: [p50, p90, p99]}
+>> stats.sums(by="category")                     # {category: {phase: ms}}
+>> stats.histogram("total", bins=[0, 50, 100, 250, 500, 1000, 5000])
+>> Har("./test.har").page_stats()["page_1"]["ttlb"]
+"""
+
+import math
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .mimes import category
+from .query import timestamp, url_host
+from .table import EntryTable, numpy, percentile
+
+PHASES = ("blocked", "dns", "connect", "ssl", "send", "wait", "receive")
+# phases of total, ssl is already part of connect
+TOTAL = ("blocked", "dns", "connect", "send", "wait", "receive")
+GROUPS = ("host", "category", "status", "page")
+QUANTILES = (50, 90, 99)
+
+
+class TimingStats:
+    """
+    table [EntryTable] - the entries the timings come from.
+    phases [dict] - phase -> milliseconds of every entry, NaN where it does not
+                    apply; "total" is the sum of the phases that apply.
+    keys [dict] - group name -> (group values, group number of every entry), built on first use.
+    """
+
+    def __init__(self, table: EntryTable) -> None:
+        self.table = table
+        self.keys: Dict[str, Tuple[List[Any], Any]] = {}
+        np = numpy()
+        self.phases: Dict[str, Any] = {}
+        for name in PHASES:
+            column = table[f"timings.{name}"]
+            # NaN < 0 is False, missing values stay NaN
+            self.phases[name] = np.where(column < 0, np.nan, column) if np is not None else array("d", (math.nan if i < 0 else i for i in column))
+        if np is not None:
+            stack = np.vstack([self.phases[i] for i in TOTAL]) if len(table) else np.empty((len(TOTAL), 0))
+            total = np.nansum(stack, axis=0)
+            total[np.isnan(stack).all(axis=0)] = np.nan
+        else:
+            total = array("d")
+            for values in zip(*(self.phases[i] for i in TOTAL)):
+                applied = [i for i in values if not math.isnan(i)]
+                total.append(math.fsum(applied) if applied else math.nan)
+        self.phases["total"] = total
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def key(self, by: str) -> List[Any]:
+        """Group value of every entry."""
+        match by:
+            case "host":
+                return [url_host(i) for i in self.table["request.url"]]
+            case "category":
+                return [category(i) for i in self.table["response.content.mimeType"]]
+            case "status":
+                return [int(i) if i == i else None for i in self.table["response.status"]]
+            case "page":
+                return list(self.table["pageref"])
+        raise ValueError(f"by must be one of {GROUPS} or None, not {by!r}")
+
+    def groups(self, by: str | None) -> Tuple[List[Any], Any]:
+        """(group values, group number of every entry); one group (None) when by is None."""
+        np = numpy()
+        if by is None:
+            return [None], np.zeros(len(self), dtype=np.intp) if np is not None else [0] * len(self)
+        if by not in self.keys:
+            index: Dict[Any, int] = {}
+            inverse = [index.setdefault(i, len(index)) for i in self.key(by)]
+            self.keys[by] = (list(index), np.asarray(inverse, dtype=np.intp) if np is not None else inverse)
+        return self.keys[by]
+
+    def phase(self, name: str) -> Any:
+        if name not in self.phases:
+            raise KeyError(f"unknown phase {name!r}, one of {PHASES + ('total',)}")
+        return self.phases[name]
+
+    def counts(self, phase: str = "total", by: str | None = None) -> Dict[Any, int]:
+        """Number of entries the phase applies to, per group."""
+        labels, inverse = self.groups(by)
+        values = self.phase(phase)
+        np = numpy()
+        if np is not None:
+            __counts = np.bincount(inverse[~np.isnan(values)], minlength=len(labels))
+            return dict(zip(labels, __counts.tolist()))
+        __counts = [0] * len(labels)
+        for group, value in zip(inverse, values):
+            if not math.isnan(value):
+                __counts[group] += 1
+        return dict(zip(labels, __counts))
+
+    def sums(self, by: str | None = None, phases: Sequence[str] = PHASES + ("total",)) -> Dict[Any, Dict[str, float]]:
+        """Milliseconds spent in every phase, per group."""
+        labels, inverse = self.groups(by)
+        np = numpy()
+        __sums: Dict[Any, Dict[str, float]] = {i: {} for i in labels}
+        for name in phases:
+            values = self.phase(name)
+            if np is not None:
+                totals = np.bincount(inverse, weights=np.nan_to_num(values, nan=0.0), minlength=len(labels)).tolist()
+            else:
+                totals = [0.0] * len(labels)
+                for group, value in zip(inverse, values):
+                    if not math.isnan(value):
+                        totals[group] += value
+            for label, total in zip(labels, totals):
+                __sums[label][name] = total
+        return __sums
+
+    def percentiles(self, phase: str = "wait", by: str | None = None, q: Sequence[float] = QUANTILES) -> Any:
+        """
+        Linear interpolated percentiles of a phase (like numpy.percentile), per
+        group; a plain list when by is None. NaN for a group the phase never applies to.
+        """
+        labels, inverse = self.groups(by)
+        values = self.phase(phase)
+        np = numpy()
+        if np is not None:
+            # sorted by group, then by value with the NaN of every group last
+            order = np.lexsort((values, inverse))
+            valid = ~np.isnan(values)
+            sizes = np.bincount(inverse[valid], minlength=len(labels))
+            starts = np.concatenate(([0], np.cumsum(np.bincount(inverse, minlength=len(labels)))[:-1]))
+            ordered = values[order]
+            out = np.full((len(labels), len(q)), np.nan)
+            has = sizes > 0
+            for column, quantile in enumerate(q):
+                rank = (sizes[has] - 1) * quantile / 100
+                low = np.floor(rank).astype(np.intp)
+                high = np.minimum(low + 1, sizes[has] - 1)
+                below, above = ordered[starts[has] + low], ordered[starts[has] + high]
+                out[has, column] = below + (above - below) * (rank - low)
+            result = {label: row.tolist() for label, row in zip(labels, out)}
+        else:
+            members: List[List[float]] = [[] for _ in labels]
+            for group, value in zip(inverse, values):
+                if not math.isnan(value):
+                    members[group].append(value)
+            result = {label: percentile(sorted(i), list(q)) for label, i in zip(labels, members)}
+        return result[None] if by is None else result
+
+    def histogram(self, phase: str = "total", bins: int | Sequence[float] = 20, by: str | None = None) -> Tuple[Any, List[float]]:
+        """
+        (counts, edges) of a phase. bins is a number of equal bins from 0 to the
+        largest value or the bin edges; values past the last edge go to the last bin.
+        counts is a list, or group -> list when by is given.
+        """
+        labels, inverse = self.groups(by)
+        values = self.phase(phase)
+        np = numpy()
+        finite = [i for i in values if not math.isnan(i)] if np is None else values[~np.isnan(values)]
+        if isinstance(bins, int):
+            top = float(max(finite)) if len(finite) else 1.0
+            edges = [top * i / bins for i in range(bins + 1)] if top > 0 else [float(i) for i in range(bins + 1)]
+        else:
+            edges = [float(i) for i in bins]
+        width = len(edges) - 1
+        if np is not None:
+            valid = ~np.isnan(values) & (values >= edges[0])
+            slots = np.clip(np.searchsorted(edges, values[valid], side="right") - 1, 0, width - 1)
+            counts = np.bincount(inverse[valid] * width + slots, minlength=len(labels) * width).reshape(len(labels), width).tolist()
+        else:
+            counts = [[0] * width for _ in labels]
+            for group, value in zip(inverse, values):
+                if math.isnan(value) or value < edges[0]:
+                    continue
+                counts[group][min(bisect_right(edges, value) - 1, width - 1)] += 1
+        if by is None:
+            return counts[0], edges
+        return dict(zip(labels, counts)), edges
+
+    def __repr__(self) -> str:
+        return f"TimingStats({len(self)} entries)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+class PageStats:
+    """
+    Aggregates of the entries of every page, computed in one pass over the columns.
+
+    pages [dict] - page id -> {
+        title, startedDateTime,
+        requests [number] - entries of the page.
+        transferred [number] - response headersSize + bodySize bytes (-1 values left out).
+        decoded [number] - response.content.size bytes.
+        onContentLoad, onLoad [number] - pageTimings, -1 when not available.
+        ttlb [number] - milliseconds from the page start to the end of its last
+                        response (startedDateTime + time of the entry), NaN without entries.
+    }
+    """
+
+    def __init__(self, table: EntryTable, pages: Iterable[Dict[str, Any]]) -> None:
+        self.pages: Dict[Any, Dict[str, Any]] = {}
+        for page in pages:
+            timings = page.get("pageTimings") or {}
+            self.pages[page.get("id")] = {
+                "title": page.get("title"),
+                "startedDateTime": page.get("startedDateTime"),
+                "requests": 0,
+                "transferred": 0.0,
+                "decoded": 0.0,
+                "onContentLoad": timings.get("onContentLoad", -1),
+                "onLoad": timings.get("onLoad", -1),
+                "ttlb": math.nan,
+            }
+        labels = list(self.pages)
+        slots = {i: n for n, i in enumerate(labels)}
+        # entries of unknown pages land in an extra slot that is dropped
+        inverse = [slots.get(i, len(labels)) for i in table["pageref"]]
+        starts = [timestamp(i["startedDateTime"]) for i in self.pages.values()] + [math.nan]
+        # end of every response, milliseconds after the start of its page; rounded to
+        # microseconds, epoch seconds as floats leave noise below that (1234.0000002)
+        ends = [
+            round((timestamp(stamp) - starts[group]) * 1000 + (time if time == time else 0.0), 3)
+            for stamp, time, group in zip(table["startedDateTime"], table["time"], inverse)
+        ]
+        size = len(labels) + 1
+        np = numpy()
+        if np is not None:
+            inverse = np.asarray(inverse, dtype=np.intp)
+            requests = np.bincount(inverse, minlength=size)
+            transferred = np.bincount(inverse, weights=positive(table["response.headersSize"]) + positive(table["response.bodySize"]), minlength=size)
+            decoded = np.bincount(inverse, weights=positive(table["response.content.size"]), minlength=size)
+            ends = np.asarray(ends, dtype=np.float64)
+            valid = ~np.isnan(ends)
+            ttlb = np.full(size, -np.inf)
+            np.maximum.at(ttlb, inverse[valid], ends[valid])
+            ttlb[np.isinf(ttlb)] = np.nan
+            columns = {"requests": requests.tolist(), "transferred": transferred.tolist(), "decoded": decoded.tolist(), "ttlb": ttlb.tolist()}
+        else:
+            columns = {"requests": [0] * size, "transferred": [0.0] * size, "decoded": [0.0] * size, "ttlb": [math.nan] * size}
+            rows = zip(inverse, table["response.headersSize"], table["response.bodySize"], table["response.content.size"], ends)
+            for group, headers, body, content, end in rows:
+                columns["requests"][group] += 1
+                columns["transferred"][group] += sum(i for i in (headers, body) if i > 0)
+                columns["decoded"][group] += content if content > 0 else 0.0
+                if end == end and not end <= columns["ttlb"][group]:
+                    columns["ttlb"][group] = end
+        for name, values in columns.items():
+            for label, value in zip(labels, values):
+                self.pages[label][name] = value
+
+    def __getitem__(self, page: Any) -> Dict[str, Any]:
+        return self.pages[page]
+
+    def __iter__(self):
+        return iter(self.pages.items())
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def __repr__(self) -> str:
+        return f"PageStats({len(self.pages)} pages)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def positive(column: Any) -> Any:
+    """A NumPy number column with its missing and negative values as 0."""
+    np = numpy()
+    return np.where(column > 0, column, 0.0)
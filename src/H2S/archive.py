@@ -0,0 +1,64 @@
+"""
+Opens HAR files that are stored compressed (.har.gz, .har.bz2, .har.xz or a
+.har inside a .zip) as a plain binary stream, decompressing as it is read.
+The compression is told by the magic bytes, not by the file name. The
+compression modules are imported when a file needs them.
+"""
+
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    import zipfile
+
+MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"PK\x03\x04": "zip",
+}
+
+
+def compression(filename: str) -> str | None:
+    """Name of the compression of a file ("gzip", "bz2", "xz", "zip"), None when it is not compressed."""
+    with open(filename, "rb") as fp:
+        head = fp.read(6)
+    for magic, kind in MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def zip_member(archive: "zipfile.ZipFile") -> "zipfile.ZipInfo":
+    """The .har file of an archive, or its only file when none is named so."""
+    files = [i for i in archive.infolist() if not i.is_dir()]
+    hars = [i for i in files if i.filename.lower().endswith(".har")]
+    if hars:
+        return hars[0]
+    if len(files) == 1:
+        return files[0]
+    raise ValueError("Could not find a HAR file inside the zip archive")
+
+
+def open_har(filename: str) -> BinaryIO:
+    """Binary, streaming file object over the (decompressed) HAR document."""
+    match compression(filename):
+        case "gzip":
+            import gzip
+
+            return gzip.open(filename, "rb")
+        case "bz2":
+            import bz2
+
+            return bz2.open(filename, "rb")
+        case "xz":
+            import lzma
+
+            return lzma.open(filename, "rb")
+        case "zip":
+            import zipfile
+
+            # the member keeps the underlying file open after the archive is closed
+            with zipfile.ZipFile(filename) as archive:
+                return archive.open(zip_member(archive))
+        case _:
+            return open(filename, "rb")
@@ -0,0 +1,196 @@
+"""
+Loading many HAR files at once on a pool of worker processes.
+
+Workers parse the files and only send small results back to the parent, a
+HarSummary (summarize) or an EntryTable (tabulate) by default, or whatever a
+picklable, module level function of a filename returns.
+
+Examples:-
+>> corpus = HarCorpus(glob.glob("./captures/*.har"), max_workers=8)
+>> for filename, summary in corpus.summaries(ordered=False):
+>>     print(filename, summary.entries, summary.status)
+>> for filename, table in load_many(files, tabulate, chunksize=4):
+>>     ...
+>> har = corpus.open(corpus.filenames[0])     # in this process, bodies deduplicated in corpus.store
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .h2s import Har, HarStream
+from .query import url_host
+from .sidecar import scalar
+from .store import BodyStore
+from .table import EntryTable
+
+
+class HarSummary:
+    """
+    filename [string] - The summarized file.
+    version [string] - Version of the HAR format.
+    creator [string] - Name of the application that created the log.
+    browser [string, optional] - Name of the browser that created the log.
+    pages [number] - Number of pages.
+    entries [number] - Number of entries.
+    transferred [number] - Sum of response headersSize and bodySize (values of -1 left out).
+    size [number] - Sum of the decoded content sizes.
+    time [number] - Sum of the entry times in milliseconds.
+    status [dict] - Number of entries per response status.
+    mimeTypes [dict] - Number of entries per content mimeType.
+    hosts [dict] - Number of entries per request host.
+    """
+
+    __slots__ = ("filename", "version", "creator", "browser", "pages", "entries", "transferred", "size", "time", "status", "mimeTypes", "hosts")
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.version = None
+        self.creator = None
+        self.browser = None
+        self.pages = 0
+        self.entries = 0
+        self.transferred = 0
+        self.size = 0
+        self.time = 0.0
+        self.status: Dict[Any, int] = {}
+        self.mimeTypes: Dict[Any, int] = {}
+        self.hosts: Dict[Any, int] = {}
+
+    def add(self, dic: Dict[str, Any]) -> None:
+        self.entries += 1
+        for field in ("response.headersSize", "response.bodySize"):
+            value = scalar(dic, field)
+            if isinstance(value, (int, float)) and value > 0:
+                self.transferred += value
+        size = scalar(dic, "response.content.size")
+        if isinstance(size, (int, float)) and size > 0:
+            self.size += size
+        time = dic.get("time")
+        if isinstance(time, (int, float)) and time > 0:
+            self.time += time
+        for counter, value in (
+            (self.status, scalar(dic, "response.status")),
+            (self.mimeTypes, scalar(dic, "response.content.mimeType")),
+            (self.hosts, url_host(scalar(dic, "request.url"))),
+        ):
+            counter[value] = counter.get(value, 0) + 1
+
+    def __repr__(self) -> str:
+        return f"HarSummary({self.filename!r}, entries={self.entries}, pages={self.pages})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+def summarize(filename: str) -> HarSummary:
+    """HarSummary of one file, read as a stream so a worker never holds the whole file."""
+    stream = HarStream(filename)
+    summary = HarSummary(filename)
+    for dic in stream.raw():
+        summary.add(dic)
+    log = stream.log
+    summary.version = log.get("version")
+    summary.creator = scalar(log, "creator.name")
+    summary.browser = scalar(log, "browser.name")
+    summary.pages = len(log.get("pages") or ())
+    return summary
+
+
+def tabulate(filename: str) -> EntryTable:
+    """EntryTable of one file, read as a stream."""
+    return EntryTable.from_raw(HarStream(filename).raw())
+
+
+def run_chunk(func: Callable[[str], Any], filenames: Sequence[str], errors: str) -> List[Tuple[str, Any]]:
+    results = []
+    for filename in filenames:
+        try:
+            results.append((filename, func(filename)))
+        except Exception as e:
+            if errors == "raise":
+                raise
+            results.append((filename, e))
+    return results
+
+
+def load_many(
+    filenames: Iterable[str],
+    func: Callable[[str], Any] = summarize,
+    max_workers: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    errors: str = "raise",
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yields (filename, func(filename)) for every file, computed on a ProcessPoolExecutor.
+
+    func [callable] - module level (picklable) function of a filename, summarize by default.
+    max_workers [number, optional] - size of the pool, the number of CPUs by default.
+    chunksize [number] - files handed to a worker at a time.
+    ordered [boolean] - results in the order of filenames, or as soon as they are ready.
+    errors [string] - "raise" to stop on the first failing file, "return" to yield its exception as the result.
+    """
+    if errors not in ("raise", "return"):
+        raise ValueError(f"errors must be 'raise' or 'return', not {errors!r}")
+    __files = list(filenames)
+    chunks = [__files[i : i + max(1, chunksize)] for i in range(0, len(__files), max(1, chunksize))]
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [executor.submit(run_chunk, func, chunk, errors) for chunk in chunks]
+        for future in futures if ordered else as_completed(futures):
+            yield from future.result()
+    finally:
+        # an error or a consumer that stops early only waits for the chunks already running
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class HarCorpus:
+    """
+    A set of HAR files processed in parallel, see load_many.
+
+    filenames [array] - The files of the corpus.
+    max_workers [number, optional] - size of the process pool.
+    chunksize [number] - files handed to a worker at a time.
+    store [BodyStore] - body store shared by the Har objects opened with open().
+    """
+
+    def __init__(
+        self,
+        filenames: Iterable[str],
+        max_workers: int | None = None,
+        chunksize: int = 1,
+        store: BodyStore | None = None,
+    ) -> None:
+        self.filenames = list(filenames)
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.store = store if store is not None else BodyStore()
+
+    def open(self, filename: str, **kwds: Any) -> Har:
+        """A Har of one file loaded in this process, its bodies deduplicated in the corpus store."""
+        return Har(filename, store=self.store, **kwds)
+
+    def hars(self, **kwds: Any) -> Iterator[Har]:
+        for filename in self.filenames:
+            yield self.open(filename, **kwds)
+
+    def map(self, func: Callable[[str], Any], ordered: bool = True, errors: str = "raise") -> Iterator[Tuple[str, Any]]:
+        return load_many(self.filenames, func, self.max_workers, self.chunksize, ordered, errors)
+
+    def summaries(self, ordered: bool = True, errors: str = "raise") -> Iterator[Tuple[str, HarSummary]]:
+        return self.map(summarize, ordered, errors)
+
+    def tables(self, ordered: bool = True, errors: str = "raise") -> Iterator[Tuple[str, EntryTable]]:
+        return self.map(tabulate, ordered, errors)
+
+    def __iter__(self) -> Iterator[Tuple[str, HarSummary]]:
+        return self.summaries()
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    def __repr__(self) -> str:
+        return f"HarCorpus({len(self.filenames)} files)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
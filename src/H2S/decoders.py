@@ -0,0 +1,380 @@
+"""
+HTTP content-coding decoders (gzip, deflate, br, zstd).
+
+Bodies are inflated incrementally, every decoder yields its output in bounded
+pieces so a large body is never produced by one giant
+allocation and a consumer can stop reading at any point. brotli and zstd are
+optional, they are imported the first time a body needs them.
+
+Examples:-
+>> decode(data, "gzip")
+>> for piece in iter_decode(data, "gzip, br"):
+>>     ...
+"""
+
+import zlib
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+CHUNK_SIZE = 1 << 16
+
+
+class DecodeError(ValueError):
+    """A body could not be decoded with the content-coding it claims."""
+
+
+class LimitExceeded(DecodeError):
+    """
+    Decoding stopped at a DecodeLimits bound.
+    partial [bytes] - the output decoded up to the bound.
+    reason [string] - "body", "ratio" or "total".
+    """
+
+    def __init__(self, reason: str, partial: bytes) -> None:
+        super().__init__(f"Decoded body exceeds the {reason} limit")
+        self.reason = reason
+        self.partial = partial
+
+
+class DecodeLimits:
+    """
+    Bounds on decompressed output, checked while a body is being inflated so
+    an oversized body never gets into memory.
+
+    body [number, optional] - maximum decoded bytes of one body.
+    total [number, optional] - maximum decoded bytes of all the bodies of one Har.
+    ratio [number, optional] - maximum decoded size / encoded size of one body.
+    truncate [boolean] - keep what was decoded up to the bound and flag the body
+                         (_Content.truncated), or raise LimitExceeded.
+    """
+
+    def __init__(self, body: int | None = None, total: int | None = None, ratio: float | None = None, truncate: bool = True) -> None:
+        self.body = body
+        self.total = total
+        self.ratio = ratio
+        self.truncate = truncate
+
+    def budget(self) -> "Budget":
+        return Budget(self.total)
+
+    def __repr__(self) -> str:
+        return f"DecodeLimits(body={self.body}, total={self.total}, ratio={self.ratio}, truncate={self.truncate})"
+
+
+class Budget:
+    """Decoded bytes still allowed under DecodeLimits.total, shared by the bodies of one Har."""
+
+    def __init__(self, total: int | None) -> None:
+        self.left = total
+        self.lock = Lock()
+
+    def take(self, size: int) -> int:
+        """Takes up to size bytes from the budget, returns how many were granted."""
+        if self.left is None:
+            return size
+        with self.lock:
+            size = min(size, self.left)
+            self.left -= size
+        return size
+
+    def give(self, size: int) -> None:
+        """Returns bytes taken for a body that turned out not to be decodable."""
+        if self.left is None:
+            return
+        with self.lock:
+            self.left += size
+
+
+def codings(header: str | None) -> List[str]:
+    """Content-codings of a Content-Encoding value, in the order they were applied."""
+    if not header:
+        return []
+    return [i.strip().lower() for i in header.split(",") if i.strip() and i.strip().lower() != "identity"]
+
+
+def pieces(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    view = memoryview(data)
+    for i in range(0, len(view), chunk_size):
+        yield bytes(view[i : i + chunk_size])
+
+
+def window(head: bytes) -> int:
+    if head[:2] == b"\x1f\x8b":
+        return 16 + zlib.MAX_WBITS
+    if len(head) > 1 and head[0] & 0x0F == 8 and (head[0] << 8 | head[1]) % 31 == 0:
+        return zlib.MAX_WBITS
+    return -zlib.MAX_WBITS
+
+
+def inflate(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    """gzip, zlib wrapped deflate and raw deflate, told apart by the first bytes."""
+    decompressor = None
+    wbits = 0
+    # start of a possible next gzip member, shorter than its magic number
+    pending = b""
+    try:
+        for chunk in chunks:
+            chunk = pending + chunk
+            pending = b""
+            while chunk:
+                if decompressor is None:
+                    wbits = window(chunk)
+                    decompressor = zlib.decompressobj(wbits)
+                elif decompressor.eof:
+                    if wbits == 16 + zlib.MAX_WBITS and len(chunk) < 2:
+                        pending = chunk
+                        break
+                    if wbits != 16 + zlib.MAX_WBITS or chunk[:2] != b"\x1f\x8b":
+                        # trailing bytes after the stream (padding, garbage) are ignored, as zlib.decompress and gzip do
+                        break
+                    # gzip allows several members one after the other
+                    decompressor = zlib.decompressobj(wbits)
+                out = decompressor.decompress(chunk, chunk_size)
+                if out:
+                    yield out
+                chunk = decompressor.unconsumed_tail or decompressor.unused_data
+            if chunk and not pending:
+                break
+        if decompressor is not None:
+            out = decompressor.flush()
+            if out:
+                yield out
+            if not decompressor.eof:
+                raise DecodeError("Truncated deflate stream")
+    except zlib.error as e:
+        raise DecodeError(str(e)) from e
+
+
+def unbrotli(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    brotli = optional("brotli")
+    if brotli is None:
+        raise DecodeError("brotli is not installed")
+    decompressor = brotli.Decompressor()
+    try:
+        for chunk in chunks:
+            if hasattr(decompressor, "can_accept_more_data"):
+                out = decompressor.process(chunk, output_buffer_limit=chunk_size)
+                if out:
+                    yield out
+                while not decompressor.can_accept_more_data():
+                    out = decompressor.process(b"", output_buffer_limit=chunk_size)
+                    if out:
+                        yield out
+            else:
+                # older brotli bindings can not bound the output
+                out = decompressor.process(chunk)
+                if out:
+                    yield out
+        # output held back by the limit once all the input has been taken
+        while hasattr(decompressor, "can_accept_more_data") and not decompressor.is_finished():
+            out = decompressor.process(b"", output_buffer_limit=chunk_size)
+            if not out:
+                break
+            yield out
+        if not decompressor.is_finished():
+            raise DecodeError("Truncated brotli stream")
+    except brotli.error as e:
+        raise DecodeError(str(e)) from e
+
+
+class ChunkReader:
+    """File like read() over an iterable of chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self.chunks = iter(chunks)
+        self.buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        out, self.buffer = self.buffer[:size], self.buffer[size:]
+        return out
+
+
+class FrameCheck:
+    """
+    Follows the frame and block headers of the first zstd frame of the input;
+    zstandard's stream_reader ends a frame cut short as quietly as a complete one.
+    complete [boolean] - the whole frame, checksum included, has gone by.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.skip = 0
+        self.state = "magic"
+        self.checksum = False
+        self.complete = False
+
+    def watch(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            self.feed(chunk)
+            yield chunk
+
+    def feed(self, data: bytes) -> None:
+        self.buffer += data
+        while not self.complete and self.state != "invalid":
+            if self.skip:
+                __skip = min(self.skip, len(self.buffer))
+                del self.buffer[:__skip]
+                self.skip -= __skip
+                if self.skip:
+                    return
+            size = {"magic": 4, "skippable": 4, "descriptor": 1, "block": 3, "end": 0}[self.state]
+            if len(self.buffer) < size:
+                return
+            self.step(int.from_bytes(self.buffer[:size], "little"))
+            del self.buffer[:size]
+
+    def step(self, value: int) -> None:
+        match self.state:
+            case "magic":
+                if value == 0xFD2FB528:
+                    self.state = "descriptor"
+                elif value & 0xFFFFFFF0 == 0x184D2A50:
+                    self.state = "skippable"
+                else:
+                    self.state = "invalid"
+            case "skippable":
+                self.skip = value
+                self.state = "magic"
+            case "descriptor":
+                single = value >> 5 & 1
+                # window descriptor, dictionary id and frame content size
+                self.skip = (1 - single) + (0, 1, 2, 4)[value & 3] + (single, 2, 4, 8)[value >> 6]
+                self.checksum = bool(value >> 2 & 1)
+                self.state = "block"
+            case "block":
+                kind = value >> 1 & 3
+                if kind == 3:
+                    self.state = "invalid"
+                    return
+                # an RLE block holds the one byte it repeats
+                self.skip = 1 if kind == 1 else value >> 3
+                if value & 1:
+                    self.skip += 4 if self.checksum else 0
+                    self.state = "end"
+            case "end":
+                self.complete = True
+
+
+def unzstd(chunks: Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    zstd = optional("compression.zstd")
+    if zstd is not None:
+        # standard library (3.14+), lzma like api
+        decompressor = zstd.ZstdDecompressor()
+        try:
+            for chunk in chunks:
+                out = decompressor.decompress(chunk, chunk_size)
+                if out:
+                    yield out
+                while not decompressor.eof and not decompressor.needs_input:
+                    out = decompressor.decompress(b"", chunk_size)
+                    if out:
+                        yield out
+                if decompressor.eof:
+                    # bytes after the frame are ignored
+                    break
+        except zstd.ZstdError as e:
+            raise DecodeError(str(e)) from e
+        if not decompressor.eof:
+            raise DecodeError("Truncated zstd stream")
+        return
+    zstandard = optional("zstandard")
+    if zstandard is None:
+        raise DecodeError("zstd support needs python 3.14 or the zstandard module")
+    check = FrameCheck()
+    try:
+        with zstandard.ZstdDecompressor().stream_reader(ChunkReader(check.watch(chunks)), read_size=chunk_size) as reader:
+            while out := reader.read(chunk_size):
+                yield out
+    except zstandard.ZstdError as e:
+        raise DecodeError(str(e)) from e
+    if not check.complete:
+        raise DecodeError("Truncated zstd stream")
+
+
+DECODERS: Dict[str, Callable[[Iterable[bytes], int], Iterator[bytes]]] = {
+    "gzip": inflate,
+    "x-gzip": inflate,
+    "deflate": inflate,
+    "br": unbrotli,
+    "zstd": unzstd,
+}
+
+_modules: Dict[str, Any] = {}
+
+
+def optional(name: str) -> Any:
+    """An optional module, imported on first use; None when it is missing."""
+    if name not in _modules:
+        try:
+            _modules[name] = __import__(name, fromlist=["_"])
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+
+def supported(header: str | None) -> bool:
+    """True when every coding of a Content-Encoding value has a decoder."""
+    return all(i in DECODERS for i in codings(header))
+
+
+def iter_decode(data: bytes, header: str | None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yields the decoded body in pieces of about chunk_size bytes (brotli rounds
+    up to its own block size, older brotli bindings do not bound the pieces at all).
+    Raises DecodeError on unsupported or broken input.
+    """
+    stream: Iterable[bytes] = pieces(data, chunk_size)
+    for coding in reversed(codings(header)):
+        if coding not in DECODERS:
+            raise DecodeError(f"Unsupported content-coding {coding!r}")
+        stream = DECODERS[coding](stream, chunk_size)
+    return iter(stream)
+
+
+def decode(
+    data: bytes,
+    header: str | None,
+    chunk_size: int = CHUNK_SIZE,
+    limits: DecodeLimits | None = None,
+    budget: Budget | None = None,
+) -> bytes:
+    """
+    The decoded body. With limits (and the budget of the Har) decoding stops as
+    soon as a bound is reached and LimitExceeded is raised with the output so far.
+    """
+    if limits is None and budget is None:
+        return b"".join(iter_decode(data, header, chunk_size))
+    bounds = []
+    if limits is not None and limits.body is not None:
+        bounds.append(("body", limits.body))
+    if limits is not None and limits.ratio is not None:
+        bounds.append(("ratio", int(limits.ratio * len(data))))
+    out = bytearray()
+    __pieces = iter_decode(data, header, chunk_size)
+    try:
+        for piece in __pieces:
+            reason, room = min([("total", len(piece))] + [(i, v - len(out)) for i, v in bounds], key=lambda i: i[1])
+            granted = min(room, len(piece))
+            if budget is not None:
+                __granted = budget.take(granted)
+                if __granted < granted:
+                    reason, granted = "total", __granted
+            out += piece[: max(granted, 0)]
+            if granted < len(piece):
+                raise LimitExceeded(reason, bytes(out))
+    except LimitExceeded:
+        raise
+    except DecodeError:
+        if budget is not None:
+            budget.give(len(out))
+        raise
+    finally:
+        __pieces.close()
+    return bytes(out)
@@ -25,11 +25,55 @@ Note:- IT IS IMPLEMENTED AS DESCRIBED BY W3C
 """
 
 import json
-from urllib.parse import urlencode
-from typing import Any, Dict, List, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
 from base64 import standard_b64decode as base64decode
-import zlib
-import brotli
+import mmap
+from array import array
+
+from .archive import compression, open_har
+from .decoders import Budget, DecodeError, DecodeLimits, LimitExceeded, decode, supported
+from .jsonscan import CHUNK_SIZE, Reader, SpanList, index_log, iter_log
+from .query import Lookup, key_columns
+from .search import SUFFIX as BODY_SUFFIX, BodyIndex, Matcher, body_text
+from .store import BodyStore, StoredBody
+from .strings import StringTable
+from .sidecar import EntryIndex, file_key, sidecar_path
+from .table import EntryTable
+
+if TYPE_CHECKING:
+    from .analytics import PageStats, TimingStats
+
+
+def urlencode(query: Any) -> str:
+    # urllib.parse costs a few milliseconds of import time, most runs never encode a query
+    from urllib.parse import urlencode
+
+    return urlencode(query)
+
+
+class _Context:
+    """
+    Settings and state shared by every object built for one Har.
+
+    limits [DecodeLimits, optional] - bounds on decompressed body output.
+    budget [Budget, optional] - decoded bytes left to the Har under limits.total.
+    store [BodyStore, optional] - where decoded bodies are deduplicated.
+    headerNames [_HeaderNames] - header names and lookup tables shared by the _Headers.
+    strings [StringTable, optional] - repeated string values interned while the json is decoded.
+    """
+
+    __slots__ = ("limits", "budget", "store", "headerNames", "strings")
+
+    def __init__(self, limits: DecodeLimits | None = None, store: BodyStore | None = None, intern: bool = False) -> None:
+        self.limits = limits
+        self.budget = limits.budget() if limits is not None else None
+        self.store = store
+        self.headerNames = _HeaderNames()
+        self.strings = StringTable() if intern else None
+
+    @property
+    def object_hook(self):
+        return self.strings.hook if self.strings is not None else None
 
 
 class _cookie:
@@ -44,6 +88,8 @@ class _cookie:
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application.
     """
 
+    __slots__ = ("name", "value", "path", "domain", "expires", "httpOnly", "secure", "comment")
+
     def __init__(self, dic: Dict[str, Any]) -> None:
         self.name = dic["name"]
         self.value = dic["value"]
@@ -81,11 +127,16 @@ class _Cookies:
         else:
             return None
 
+    __slots__ = ("_cookies",)
+
     def __init__(self, dics: List[Dict[str, Any]] | None):
         if not dics:
             return
         self._cookies = [_cookie(i) for i in dics]
-        self.cookieDic = {i.name: i.value for i in self._cookies}
+
+    @property
+    def cookieDic(self) -> Dict[str, Any]:
+        return {i.name: i.value for i in self._cookies}
 
     @property
     def cookies(self) -> Dict[str, Any]:
@@ -108,6 +159,8 @@ class _header:
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application.
     """
 
+    __slots__ = ("name", "value", "comment")
+
     def __init__(self, dic: Dict[str, Any]) -> None:
         self.name = dic["name"]
         self.value = dic["value"]
@@ -135,18 +188,49 @@ class _Headers:
         else:
             return None
 
-    def __init__(self, dics: List[Dict[str, Any]] | None):
+    __slots__ = ("__names", "__values", "__comments", "__index")
+
+    def __init__(self, dics: List[Dict[str, Any]] | None, ctx: "_Context | None" = None):
         if not dics:
             return
-        self.__headersList = [_header(i) for i in dics]
-        self.headerDic = {i.name: i.value for i in self.__headersList}
+        names = ctx.headerNames if ctx is not None else _HeaderNames()
+        self.__names, self.__index = names.layout(tuple(i["name"] for i in dics))
+        self.__values = tuple(i["value"] for i in dics)
+        __comments = tuple(i.get("comment") for i in dics)
+        self.__comments = __comments if any(__comments) else None
+
+    @property
+    def headerDic(self) -> Dict[str, Any]:
+        return dict(zip(self.__names, self.__values))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Value of a header, case-insensitive; the last one wins when it is repeated."""
+        positions = self.__index.get(name.lower())
+        return self.__values[positions[-1]] if positions else default
+
+    def getall(self, name: str) -> List[Any]:
+        """Every value of a repeated header (e.g. set-cookie), case-insensitive."""
+        return [self.__values[i] for i in self.__index.get(name.lower(), ())]
+
+    def items(self) -> List[tuple]:
+        return list(zip(self.__names, self.__values))
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.__index
+
+    def __len__(self) -> int:
+        return len(self.__names)
+
+    def __iter__(self) -> Iterator[_header]:
+        for i, name in enumerate(self.__names):
+            yield _header({"name": name, "value": self.__values[i], "comment": self.__comments[i] if self.__comments else None})
 
     @property
     def headers(self):
         return self.headerDic
 
     def __repr__(self) -> str:
-        return "; ".join([f"{i.name}={i.value}" for i in self.__headersList])
+        return "; ".join([f"{name}={value}" for name, value in zip(self.__names, self.__values)])
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -155,12 +239,51 @@ class _Headers:
         return self.headerDic
 
 
+class _HeaderNames:
+    """
+    Header names interned for one Har, with the case-insensitive lookup table of
+    every distinct sequence of names. Entries answered by the same server share
+    one names tuple and one table instead of each holding its own. Both tables
+    start over once they hold limit items, so a stream of unusual headers (an
+    endless HarStream) can not grow them without bound; only the sharing between
+    entries on either side of the reset is lost.
+    """
+
+    __slots__ = ("names", "layouts")
+
+    limit: int = 4096
+
+    def __init__(self) -> None:
+        self.names: Dict[str, str] = {}
+        self.layouts: Dict[tuple, tuple] = {}
+
+    def intern(self, name: str) -> str:
+        return self.names.setdefault(name, name)
+
+    def layout(self, names: tuple) -> tuple:
+        """(interned names, lower case name -> positions) of a sequence of header names."""
+        __layout = self.layouts.get(names)
+        if __layout is None:
+            if len(self.layouts) >= self.limit or len(self.names) >= self.limit:
+                self.layouts.clear()
+                self.names.clear()
+            interned = tuple(self.intern(i) for i in names)
+            index: Dict[str, tuple] = {}
+            for position, name in enumerate(interned):
+                key = self.intern(name.lower())
+                index[key] = index.get(key, ()) + (position,)
+            __layout = self.layouts[interned] = (interned, index)
+        return __layout
+
+
 class _query:
     """
     name [string] - The name of the query.
     value [string] - The query value.
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application."""
 
+    __slots__ = ("name", "value", "comment")
+
     def __init__(self, dic: Dict[str, Any]):
         self.name = dic["name"]
         self.value = dic["value"]
@@ -214,6 +337,8 @@ class _param:
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application.
     """
 
+    __slots__ = ("empty", "name", "value", "fileName", "contentType", "comment")
+
     def __init__(self, dic: Dict[str, Any] | None) -> None:
         self.empty = False
         if not dic:
@@ -334,53 +459,171 @@ class _Content:
         else:
             return None
 
-    def __init__(self, dic: Dict[str, Any] | None, headers: _Headers) -> None:
+    # keep the decoded body once it has been read, set to False to decode on every read
+    cache_decoded: bool = True
+    # take the decoded body from the budget of the Har, set to False for a body read once and dropped
+    charge_budget: bool = True
+
+    def __init__(self, dic: Dict[str, Any] | None, headers: _Headers, ctx: _Context | None = None) -> None:
         if not dic:
             return
         self.size = dic.get("size")
         self.compression = dic.get("compression")
         self.mimeType = dic.get("mimeType")
         self.text = dic.get("text")
-        self.content = self.text
         self.comment = dic.get("comment")
         self.encoding = dic.get("encoding")
         self.headers = headers
-        self.check()
+        self.ctx = ctx
+        # set when the decoded body was cut at a DecodeLimits bound
+        self.truncated = False
+        # bytes of the body taken from the budget of the Har, a body is only charged once
+        self.charged: int | None = None
+        # the LimitExceeded of a body over a bound (truncate=False), raised again on every read
+        self.exceeded: LimitExceeded | None = None
+        # the body stays encoded until content or buffer() is read, only its bytes are kept
+        self.__body: bytes | None = None
+        self.__stored: StoredBody | None = None
+        if self.encoding and not (self.encoding == "base64" and self.text):
+            raise ReferenceError("Could not Find the encoding ", self.encoding)
+
+    @classmethod
+    def transient(cls, entry: Dict[str, Any], ctx: _Context | None = None) -> "_Content | None":
+        """
+        _Content of the response of a raw entry for a single read of its body,
+        decoded under the body and ratio limits of ctx but neither cached, stored
+        nor charged to its budget: the budget bounds what the Har keeps, and the
+        entry charges its body once when it is read through Har.entries.
+        """
+        response = entry.get("response")
+        if not isinstance(response, dict):
+            return None
+        try:
+            __content = cls(response.get("content"), _Headers(response.get("headers"), ctx=ctx), ctx=ctx)
+        except ReferenceError:
+            # unknown encoding, nothing to decode it with
+            return None
+        if __content is not None:
+            __content.cache_decoded = False
+            __content.charge_budget = False
+        return __content
 
-    def decompress(self):
-        if isinstance(self.content, bytes):
-            try:
-                self.content = zlib.decompress(self.content, wbits=16 + zlib.MAX_WBITS)
-            except zlib.error:
-                try:
-                    self.content = zlib.decompress(self.content)
-                except zlib.error:
-                    pass
-            finally:
-                self.content = str(self.content)
-
-    def ifcompressed(self):
-        if "content-encoding" in self.headers.headerDic:
-            compression = self.headers.headerDic["content-encoding"]
-            if compression in ["gzip", "deflate", "br"]:
-                self.decompress()
-            else:
-                self.content = str(self.content)
-
-    def check(self):
-        if self.encoding:
-            if self.encoding == "base64" and self.text:
-                self.content = base64decode(self.text)
-                self.ifcompressed()
-                self.__delattr__("text")
+    @property
+    def content(self) -> str | bytes | None:
+        """The decoded body as bytes for a base64 text, the text as it is otherwise."""
+        return self.check()
+
+    @property
+    def decoded(self) -> bool:
+        """False while a base64 body has not been decoded yet."""
+        return self.__body is not None or not (self.encoding == "base64" and self.text)
+
+    def body(self) -> bytes | None:
+        """The decoded body as bytes: base64 undone, content-encoding removed, text as UTF-8."""
+        if self.__body is not None:
+            return self.__body
+        if self.exceeded is not None:
+            raise self.exceeded
+        if self.encoding == "base64" and self.text:
+            __body = self.ifcompressed(base64decode(self.text))
+        elif self.text is not None:
+            __body = self.text.encode("utf-8", "surrogatepass")
+        else:
+            return None
+        if self.truncated and self.charged is not None:
+            # decoded again without the budget, cut where it was cut the first time
+            __body = __body[: self.charged]
+        if self.cache_decoded:
+            if self.ctx is not None and self.ctx.store is not None:
+                # the store forgets the body once no _Content holds its StoredBody
+                self.__stored = self.ctx.store.put(__body, self)
+                __body = self.__stored.value
+            self.__body = __body
+        return __body
+
+    def buffer(self) -> memoryview | None:
+        """
+        Read-only view over the decoded body, the cached bytes are not copied.
+        >> hashlib.sha256(entry.response._content.buffer())
+        """
+        __body = self.body()
+        return memoryview(__body) if __body is not None else None
+
+    def write_to(self, fileobj: Any) -> int:
+        """Writes the decoded body to a binary file object, returns the number of bytes written."""
+        __buffer = self.buffer()
+        if __buffer is None:
+            return 0
+        fileobj.write(__buffer)
+        return __buffer.nbytes
+
+    def budget(self) -> Budget | None:
+        """The budget of the Har while the body has not been charged to it yet."""
+        if self.ctx is None or self.charged is not None or not self.charge_budget:
+            return None
+        return self.ctx.budget
+
+    def exceed(self, error: LimitExceeded) -> bytes:
+        """The output up to the bound (truncate) or error raised, now and on every later read."""
+        if not self.ctx.limits.truncate:
+            self.exceeded = error
+            raise error
+        self.truncated = True
+        return error.partial
+
+    def charge(self, content: bytes) -> bytes:
+        """
+        Holds a body that needed no decompression to DecodeLimits.body and takes
+        it from the budget of the Har, cut to what was granted.
+        """
+        if self.ctx is None or self.ctx.limits is None:
+            return content
+        reason, granted = "body", len(content)
+        if self.ctx.limits.body is not None:
+            granted = min(granted, self.ctx.limits.body)
+        budget = self.budget()
+        if budget is not None:
+            self.charged = budget.take(granted)
+            if self.charged < granted:
+                reason, granted = "total", self.charged
+        if granted < len(content):
+            return self.exceed(LimitExceeded(reason, content[:granted]))
+        return content
+
+    def decompress(self, content: bytes, coding: str = "gzip") -> bytes:
+        budget = self.budget()
+        try:
+            if self.ctx is not None and self.ctx.limits is not None:
+                __content = decode(content, coding, limits=self.ctx.limits, budget=budget)
             else:
-                raise ReferenceError("Could not Find the encoding ", self.encoding)
+                __content = decode(content, coding)
+        except LimitExceeded as e:
+            if budget is not None:
+                self.charged = len(e.partial)
+            return self.exceed(e)
+        except DecodeError:
+            # text of a HAR is often already decoded even though the header says otherwise
+            return self.charge(content)
+        if budget is not None:
+            self.charged = len(__content)
+        return __content
+
+    def ifcompressed(self, content: bytes) -> bytes:
+        compression = self.headers.get("content-encoding") if self.headers else None
+        if compression is not None and supported(compression):
+            return self.decompress(content, compression)
+        return self.charge(content)
+
+    def check(self) -> str | bytes | None:
+        if self.encoding == "base64" and self.text:
+            return self.body()
+        return self.text
 
     def __call__(self, *args: Any, **kwds: Any) -> str | bytes | None:
         return self.content
 
     def __repr__(self) -> str:
-        return f"content = {self.content:.25!r}"
+        return f"content = {self.content!r:.25}"
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -406,7 +649,7 @@ class _Request:
         else:
             return None
 
-    def __init__(self, dic: Dict[str, Any] | None):
+    def __init__(self, dic: Dict[str, Any] | None, ctx: _Context | None = None):
         if not dic:
             return
         self.url = dic.get("url", "")
@@ -417,7 +660,7 @@ class _Request:
         self.httpVersion = dic.get("httpVersion")
         self._query = _Query(dic.get("queryString"))
         self._cookies = _Cookies(dic.get("cookies"))
-        self._headers = _Headers(dic.get("headers"))
+        self._headers = _Headers(dic.get("headers"), ctx=ctx)
         self._postData = _PostData(dic.get("postData"))
 
         # self.queryString = self.query
@@ -470,7 +713,7 @@ class _Response:
         else:
             return None
 
-    def __init__(self, dic: Dict[str, Any] | None):
+    def __init__(self, dic: Dict[str, Any] | None, ctx: _Context | None = None):
         if not dic:
             return
         self.status = dic.get("status", 0)
@@ -481,14 +724,14 @@ class _Response:
         self.httpVersion = dic.get("httpVersion")
         self.redirectUrl = dic.get("redirectURL")
         self._cookies = _Cookies(dic.get("cookies"))
-        self._headers = _Headers(dic.get("headers"))
-        self._content = _Content(dic.get("content"), self._headers)
+        self._headers = _Headers(dic.get("headers"), ctx=ctx)
+        self._content = _Content(dic.get("content"), self._headers, ctx=ctx)
 
         self.headersSize = self.headerSize
         self.redirectURL = self.redirectUrl
 
     def __repr__(self) -> str:
-        return f"{self.content:.25}"
+        return f"{self.content!s:.25}"
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -554,6 +797,16 @@ class _Cache:
         return self.__repr__()
 
 
+def phase(value: Any) -> int | float:
+    """A timings value as a number, kept as it is when it already is one."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return -1
+
+
 class _Timings:
     """
     blocked [number, optional] - Time spent in a queue waiting for a network connection. Use -1 if the timing does not apply to the current request.
@@ -566,6 +819,8 @@ class _Timings:
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application.
     """
 
+    __slots__ = ("blocked", "dns", "connect", "send", "wait", "receive", "ssl", "comment", "costumes", "total")
+
     def __new__(cls, x, /, **kwds):
         if x:
             return super(_Timings, cls).__new__(cls)
@@ -575,16 +830,18 @@ class _Timings:
     def __init__(self, dic: Dict[str, str | int] | None):
         if not dic:
             return
-        self.blocked = int(dic.get("blocked", 0))
-        self.dns = int(dic.get("dns", 0))
-        self.connect = int(dic.get("connect", 0))
-        self.send = int(dic.get("send", 0))
-        self.wait = int(dic.get("wait", 0))
-        self.receive = int(dic.get("receive", 0))
-        self.ssl = int(dic.get("ssl", 0))
-        self.comment = int(dic.get("comment", 0))
+        # phases are milliseconds with a fraction, -1 when they do not apply
+        self.blocked = phase(dic.get("blocked", 0))
+        self.dns = phase(dic.get("dns", 0))
+        self.connect = phase(dic.get("connect", 0))
+        self.send = phase(dic.get("send", 0))
+        self.wait = phase(dic.get("wait", 0))
+        self.receive = phase(dic.get("receive", 0))
+        self.ssl = phase(dic.get("ssl", 0))
+        self.comment = dic.get("comment")
         self.costumes = parse_costume(dic=dic)
-        self.total = self.blocked + self.dns + self.connect + self.send + self.wait + self.receive
+        # ssl is already counted in connect
+        self.total = sum(i for i in (self.blocked, self.dns, self.connect, self.send, self.wait, self.receive) if i > 0)
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self.total
@@ -661,12 +918,17 @@ class _page:
         self.id = dic.get("id")
         self.title = dic.get("title")
         self.started = dic.get("startedDateTime")
-        if isinstance(dic["pageTimings"], dict):
+        self.pageTimings = None
+        #    milliseconds since page load started, -1 when not available
+        self.onContentLoad = self.onLoad = self.loadtime = -1
+        # time from DOMContentLoaded to load, None unless both are known
+        self.loadDiff = None
+        if isinstance(dic.get("pageTimings"), dict):
             self.pageTimings = dic["pageTimings"]
-            self.loadDiff = self.pageTimings.get("onContentLoad", 0) - self.pageTimings.get("onLoad", 0)
-
-            #    milliseconds since page load started
-            self.loadtime = self.pageTimings.get("onLoad", -1)
+            self.onContentLoad = phase(self.pageTimings.get("onContentLoad", -1))
+            self.onLoad = phase(self.pageTimings.get("onLoad", -1))
+            self.loadDiff = self.onLoad - self.onContentLoad if self.onLoad >= 0 and self.onContentLoad >= 0 else None
+            self.loadtime = self.onLoad
         self.costumes = parse_costume(dic=dic)
 
     def __repr__(self) -> str:
@@ -687,8 +949,8 @@ class Pages:
         ]
     """
 
-    def __init__(self, dics: List[Dict[str, str | dict] | None]) -> None:
-        self.__pageList = [_page(i) for i in dics]
+    def __init__(self, dics: List[Dict[str, str | dict] | None] | None) -> None:
+        self.__pageList = [_page(i) for i in dics or []]
         self.pageDic = {i.id: i for i in self.__pageList}
 
     # def __getattribute__(self, __name: str) -> Any:
@@ -718,22 +980,49 @@ class _entry:
     comment [string, optional] (new in 1.2) - A comment provided by the user or the application.
     """
 
-    def __init__(self, dic: Dict[str, Union[Dict[str, Any], Any]]):
+    __slots__ = (
+        "pageref",
+        "started",
+        "comment",
+        "timeTaken",
+        "request",
+        "response",
+        "cache",
+        "timings",
+        "serverIp",
+        "connection",
+        "costumes",
+        "raw",
+    )
+
+    def __init__(self, dic: Dict[str, Union[Dict[str, Any], Any]], ctx: _Context | None = None):
+        # the source dict, what HarWriter serializes
+        self.raw = dic
         self.pageref = dic.get("pageref")
         self.started = dic.get("startedDateTime")
-        self.startedDateTime = self.started
         self.comment = dic.get("comment")
         self.timeTaken = dic.get("time")
-        self.time = self.timeTaken
-        self.request = _Request(dic.get("request"))
-        self.response = _Response(dic.get("response"))
+        self.request = _Request(dic.get("request"), ctx=ctx)
+        self.response = _Response(dic.get("response"), ctx=ctx)
         self.cache = _Cache(dic.get("cache"))
         self.timings = _Timings(dic.get("timings"))
         self.serverIp = dic.get("serverIPAddress")
-        self.ip = self.serverIp
         self.connection = dic.get("connection")
         self.costumes = parse_costume(dic)
 
+    # aliases of the spec names
+    @property
+    def startedDateTime(self):
+        return self.started
+
+    @property
+    def time(self):
+        return self.timeTaken
+
+    @property
+    def ip(self):
+        return self.serverIp
+
     def __repr__(self) -> str:
         return f" {self.request} "
 
@@ -757,8 +1046,90 @@ class Entries:
     ]
     """
 
-    def __init__(self, dics: List[Dict[str, Union[Dict[str, Any], Any]]]):
-        self.entries = [_entry(i) for i in dics]
+    def __init__(
+        self,
+        dics: Sequence[Dict[str, Union[Dict[str, Any], Any]]] | None,
+        cache: bool = True,
+        index: EntryIndex | None = None,
+        ctx: _Context | None = None,
+    ):
+        # raw entries are kept as they are and an _entry is only built when asked for
+        self.raw = dics if dics is not None else []
+        # precomputed scalar columns, when the file was opened with an index cache
+        self.index = index
+        self.ctx = ctx if ctx is not None else _Context()
+        self.__lookup: Lookup | None = None
+        self.__pages: Dict[Any, array] | None = None
+        self.__cache: List[_entry | None] | None = [None] * len(self.raw) if cache else None
+
+    def entry(self, index: int) -> _entry:
+        if self.__cache is None:
+            return _entry(self.raw[index], ctx=self.ctx)
+        __entry = self.__cache[index]
+        if __entry is None:
+            __entry = self.__cache[index] = _entry(self.raw[index], ctx=self.ctx)
+        return __entry
+
+    @property
+    def entries(self) -> List[_entry]:
+        return list(self)
+
+    @property
+    def lookup(self) -> Lookup:
+        """Secondary indexes on host, path, method, status and mime, built on first use."""
+        if self.__lookup is None:
+            self.__lookup = Lookup(key_columns(self.raw, self.index))
+        return self.__lookup
+
+    def page_index(self) -> Dict[Any, array]:
+        """
+        pageref -> positions of its entries in file order, built once. Har builds
+        it at load time when the raw entries are in memory or the sidecar has the
+        pagerefs; a mapped file without sidecar decodes every entry the first time.
+        """
+        if self.__pages is None:
+            if self.index is not None:
+                __pagerefs: Iterable[Any] = self.index.column("pageref")
+            else:
+                __pagerefs = (i.get("pageref") for i in self.raw)
+            __pages: Dict[Any, array] = {}
+            for position, pageref in enumerate(__pagerefs):
+                positions = __pages.get(pageref)
+                if positions is None:
+                    positions = __pages[pageref] = array("l")
+                positions.append(position)
+            self.__pages = __pages
+        return self.__pages
+
+    def page(self, pageref: Any) -> List[_entry]:
+        """Entries of one page, pageref being a page id or a _page."""
+        if isinstance(pageref, _page):
+            pageref = pageref.id
+        return [self.entry(i) for i in self.page_index().get(pageref, ())]
+
+    def find(self, **criteria: Any) -> List[_entry]:
+        """
+        Entries matching every criterion, see query.Lookup.positions.
+        >> x.entries.find(host="api.example.com", status=range(500, 600))
+        >> x.entries.find(method="POST", path="/graphql")
+        """
+        return [self.entry(i) for i in self.lookup.positions(**criteria)]
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self.entry(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("entry index out of range")
+        return self.entry(index)
+
+    def __iter__(self) -> Iterator[_entry]:
+        for i in range(len(self)):
+            yield self.entry(i)
 
     def __call__(self, *args: Any, **kwds: Any) -> Any:
         return self.entries
@@ -770,12 +1141,25 @@ class Entries:
         return self.__repr__()
 
 
+# members Har.header sets from the log
+HEADER = ("log", "version", "creator", "browser", "pages", "comment", "costumes")
+
+
 class Har:
     """
 
     Examples:-
     >> x = Har("./test.har")
     >> x.version
+    >> x = Har("./untrusted.har", limits=DecodeLimits(body=50 << 20, total=1 << 30, ratio=100))
+    >> x = Har("./test.har", intern=True)
+    >> x.ctx.strings.stats()      # memory saved by interning repeated values
+
+    intern [boolean] - share one copy of the values repeated across entries (methods,
+                       header names and values, mime types ...) while the file is
+                       decoded. Trades CPU for memory: the object_hook runs for every
+                       JSON object and makes loading about 1.6x slower, worth it
+                       for captures that are kept in memory for long. Off by default.
 
 
     version [ string, Required] -  Version number of the format.
@@ -786,20 +1170,246 @@ class Har:
     comment [ string, Optional] -  A comment provided by the user or the application.
     """
 
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self,
+        filename: str,
+        stream: bool = False,
+        mmap: bool = False,
+        index_cache: bool | str = False,
+        limits: DecodeLimits | None = None,
+        store: BodyStore | None = None,
+        intern: bool = False,
+    ) -> None:
         self.filename = filename
-        self.parse()
-        self.clean()
+        # streamed entries are dropped right away, interning them would only grow the table
+        self.ctx = _Context(limits, store, intern and not stream)
+        self.mapped = None
+        self.index: EntryIndex | None = None
+        self.bodyIndex: BodyIndex | None = None
+        if stream:
+            self.stream()
+        elif mmap or index_cache:
+            self.map(index_cache)
+        else:
+            self.parse()
+            self.clean()
+
+    @staticmethod
+    def iter_entries(filename: str, limits: DecodeLimits | None = None) -> Iterator["_entry"]:
+        """
+        Yields the entries of the file one at a time without loading the whole file.
+        >> for entry in Har.iter_entries("./huge.har"):
+        >>     print(entry.request.url)
+        """
+        return iter(HarStream(filename, ctx=_Context(limits)))
+
+    def stream(self):
+        # the header is only read when one of its members is first used, see __getattr__
+        self.raw_dic = None
+        for name in HEADER:
+            self.__dict__.pop(name, None)
+        self.entries = HarStream(self.filename, ctx=self.ctx)
+
+    def __getattr__(self, name: str) -> Any:
+        # header members of a streamed file: a pass over the entries has already
+        # collected them, otherwise HarStream.log scans the file for them once
+        if name in HEADER and isinstance(self.__dict__.get("entries"), HarStream):
+            self.header(self.entries.log)
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def map(self, index_cache: bool | str = False):
+        """
+        Maps the file and records the byte span of every entry and page,
+        each one is decoded only when it is accessed.
+        With index_cache the spans and the scalar columns of sidecar.EntryIndex are
+        kept in a sidecar file (next to the HAR, or inside index_cache when it is a
+        directory) and reused as long as the file does not change.
+        A compressed file can not be mapped, it is loaded as a whole instead.
+        """
+        if compression(self.filename):
+            self.parse()
+            self.clean()
+            return
+        with open(self.filename, "rb") as __file_pointer:
+            try:
+                self.mapped = mmap.mmap(__file_pointer.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self.error(0)
+        self.raw_dic = None
+        if index_cache:
+            __key = file_key(self.filename)
+            __path = sidecar_path(self.filename, index_cache if isinstance(index_cache, str) else None)
+            self.index = EntryIndex.load(__path, __key, self.mapped)
+            if self.index is None:
+                self.index = EntryIndex.build(*index_log(self.mapped))
+                try:
+                    self.index.save(__path, __key)
+                except OSError:
+                    # a read only location only costs the next open a rescan
+                    pass
+            __log, __entries, __pages = self.index.log, self.index.entries, self.index.pages
+        else:
+            __log, __entries, __pages = index_log(self.mapped)
+        __entries.object_hook = __pages.object_hook = self.ctx.object_hook
+        self.entries = Entries(__entries, index=self.index, ctx=self.ctx)
+        if self.index is not None:
+            self.entries.page_index()
+        self.header(dict(__log, pages=__pages))
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
 
     def parse(self):
-        __file_pointer = open(self.filename, "r")
+        # gzip, bz2, xz and zip files are inflated while they are read
+        __file_pointer = open_har(self.filename)
         if __file_pointer.readable():
-            self.raw_dic = json.load(__file_pointer)
+            self.raw_dic = json.load(__file_pointer, object_hook=self.ctx.object_hook)
         else:
             self.error(1)
         __file_pointer.close()
         # self.__delattr__("_HAR__file_pointer")
 
+    def page_stats(self) -> "PageStats":
+        """
+        Per page request count, bytes, onContentLoad/onLoad and time to last byte, see analytics.PageStats.
+        >> x = Har("./test.har")
+        >> x.page_stats()["page_1"]
+        """
+        from .analytics import PageStats
+
+        return PageStats(self.table(), self.log.get("pages") or ())
+
+    def timing_stats(self) -> "TimingStats":
+        """
+        Timing percentiles, histograms and sums per host, mime category, status or page, see analytics.TimingStats.
+        >> x = Har("./test.har")
+        >> x.timing_stats().percentiles("wait", by="host")
+        """
+        from .analytics import TimingStats
+
+        return TimingStats(self.table())
+
+    def table(self) -> EntryTable:
+        """
+        Columnar view of every scalar field of the entries, see table.EntryTable.
+        >> t = Har("./test.har").table()
+        >> t.percentile("timings.wait", [50, 90, 99])
+        """
+        if isinstance(self.entries, HarStream):
+            return EntryTable.from_raw(self.entries.raw())
+        return EntryTable.from_raw(self.entries.raw, self.entries.index)
+
+    def decode_all(self, workers: int | None = None) -> int:
+        """
+        Decodes (base64 and decompression) every response body on a pool of
+        threads and keeps the results, zlib and brotli release the GIL while
+        they inflate. Returns the number of bodies decoded.
+        >> x = Har("./test.har")
+        >> x.decode_all(workers=8)
+        """
+        if isinstance(self.entries, HarStream):
+            raise ValueError("decode_all needs the entries in memory, open the file without stream=True")
+        contents = [i.response._content for i in self.entries if i.response and i.response._content]
+        contents = [i for i in contents if not i.decoded]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(lambda content: content.content, contents):
+                pass
+        return len(contents)
+
+    def search_index(self, cache: bool | str = False) -> BodyIndex:
+        """
+        Trigram index over the response bodies, see search.BodyIndex. Built once
+        per Har (every body gets decoded, one at a time); with cache it is kept in
+        a sidecar file (next to the HAR, or inside cache when it is a directory)
+        like index_cache.
+        """
+        if self.bodyIndex is not None:
+            return self.bodyIndex
+        if isinstance(self.entries, HarStream):
+            raise ValueError("search_index needs the entries in memory, open the file without stream=True")
+        if cache:
+            __key = file_key(self.filename)
+            __path = sidecar_path(self.filename, cache if isinstance(cache, str) else None, BODY_SUFFIX)
+            self.bodyIndex = BodyIndex.load(__path, __key)
+            if self.bodyIndex is None:
+                self.bodyIndex = BodyIndex.build(self.body_texts())
+                try:
+                    self.bodyIndex.save(__path, __key)
+                except OSError:
+                    pass
+        else:
+            self.bodyIndex = BodyIndex.build(self.body_texts())
+        return self.bodyIndex
+
+    def body_texts(self) -> Iterator[str]:
+        """
+        The body text of every entry, in order. Each body is decoded from the raw
+        entry on its own and dropped once consumed, no _entry is built or cached.
+        """
+        for dic in self.entries.raw:
+            yield body_text(_Content.transient(dic, self.ctx))
+
+    def search(self, sample: str, cache: bool | str = False) -> List["_entry"]:
+        """
+        Entries whose response body contains sample, checked exactly on the
+        candidates of the body index only.
+        >> x = Har("./test.har")
+        >> x.search("Fifty shades of neigh!")
+        """
+        __matched = []
+        for i in self.search_index(cache).candidates(sample):
+            __entry = self.entries.entry(i)
+            if __entry.response and sample in body_text(__entry.response._content):
+                __matched.append(__entry)
+        return __matched
+
+    def search_many(self, samples: Iterable[str], cache: bool | str = False) -> Dict[str, List[Tuple["_entry", List[int]]]]:
+        """
+        Every sample located in one pass over each candidate body, see search.Matcher.
+        Returns sample -> [(entry, offsets in search.body_text of its body), ...], entries in file order.
+        >> x = Har("./test.har")
+        >> x.search_many(["order-1234", "9.99"])
+        """
+        __matcher = Matcher(samples)
+        __index = self.search_index(cache)
+        __found: Dict[str, List[Tuple[_entry, List[int]]]] = {i: [] for i in __matcher.samples}
+        __positions = set()
+        for sample in __matcher.samples:
+            __positions.update(__index.candidates(sample))
+        for i in sorted(__positions):
+            __entry = self.entries.entry(i)
+            if not __entry.response:
+                continue
+            for sample, offsets in __matcher.find(body_text(__entry.response._content)).items():
+                __found[sample].append((__entry, offsets))
+        return __found
+
+    def write(self, target: Any, entries: Iterable[Any] | None = None, bodies: str = "keep") -> int:
+        """
+        Writes this log to target with entries, every entry by default, see writer.HarWriter.
+        Returns the number of entries written.
+        >> x = Har("./huge.har", mmap=True)
+        >> x.write("./errors.har", x.entries.find(status=range(500, 600)), bodies="drop")
+        """
+        from .writer import HarWriter
+
+        if entries is None:
+            if isinstance(self.entries, HarStream):
+                entries = self.entries.raw()
+            elif isinstance(self.entries.raw, SpanList):
+                # the JSON of every entry is copied from the mapped file as it is
+                __raw = self.entries.raw
+                entries = (__raw.raw(i) for i in range(len(__raw)))
+            else:
+                entries = self.entries.raw
+        with HarWriter(target, self.log, bodies, self.ctx) as __writer:
+            return __writer.write_all(entries)
+
     def error(self, kind):
         match kind:
             case 0:
@@ -811,15 +1421,109 @@ class Har:
         __log = self.raw_dic.get("log")
         if not __log:
             self.error(0)
-        self.version = __log.get("version")
-        self.creator = Creator(__log.get("creator"))
-        self.entries = Entries(__log.get("entries"))
+        self.entries = Entries(__log.get("entries"), ctx=self.ctx)
+        self.entries.page_index()
+        self.header(__log)
+
+    def header(self, log: Dict[str, Any]):
+        # every member but entries, what HarWriter writes before the entries
+        self.log = {i: v for i, v in log.items() if i != "entries"}
+        self.version = log.get("version")
+        self.creator = Creator(log.get("creator"))
 
         # Optional Headers or Entires
-        self.browser = Browser(__log.get("browser", None))
-        self.pages = Pages(__log.get("pages", None))
-        self.comment = __log.get("comment", None)
-        self.costumes = parse_costume(dic=__log)
+        self.browser = Browser(log.get("browser", None))
+        self.pages = Pages(log.get("pages", None))
+        self.comment = log.get("comment", None)
+        self.costumes = parse_costume(dic=log)
+
+
+class HarStream:
+    """
+    Streaming view over a HAR file, the log.entries array is tokenized
+    incrementally and only one entry is held in memory at a time.
+
+    Examples:-
+    >> x = HarStream("./huge.har")
+    >> x.version
+    >> for entry in x:
+    >>     print(entry.request.url)
+
+    log [object] - Every member of the log except entries (pages included). A full
+                   pass over the entries collects it on the way; otherwise, as pages
+                   may come after entries in the file, the first access scans the
+                   whole file once without decoding the entries.
+    """
+
+    def __init__(self, filename: str, chunk_size: int = CHUNK_SIZE, ctx: _Context | None = None) -> None:
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.ctx = ctx if ctx is not None else _Context()
+        self.__log: Dict[str, Any] | None = None
+
+    def scan(self, skip=()):
+        with open_har(self.filename) as fp:
+            yield from iter_log(Reader(fp, self.chunk_size), skip=skip)
+
+    def collect(self, key: str, raw: bytes | None, log: Dict[str, Any]):
+        if key == "pages":
+            log.setdefault("pages", []).append(json.loads(raw))
+        else:
+            log[key] = json.loads(raw)
+
+    @property
+    def log(self) -> Dict[str, Any]:
+        if self.__log is None:
+            log: Dict[str, Any] = {}
+            for key, _, _, raw in self.scan(skip=("entries",)):
+                if key != "entries":
+                    self.collect(key, raw, log)
+            self.__log = log
+        return self.__log
+
+    @property
+    def version(self):
+        return self.log.get("version")
+
+    @property
+    def creator(self):
+        return Creator(self.log.get("creator"))
+
+    @property
+    def browser(self):
+        return Browser(self.log.get("browser"))
+
+    @property
+    def pages(self):
+        return Pages(self.log.get("pages"))
+
+    @property
+    def comment(self):
+        return self.log.get("comment")
+
+    def raw(self) -> Iterator[Dict[str, Any]]:
+        """Yields the entries as decoded dicts, without building _entry objects."""
+        log: Dict[str, Any] = {}
+        for key, _, _, raw in self.scan():
+            if key == "entries":
+                yield json.loads(raw, object_hook=self.ctx.object_hook)
+            else:
+                self.collect(key, raw, log)
+        if self.__log is None:
+            self.__log = log
+
+    def __iter__(self) -> Iterator["_entry"]:
+        for dic in self.raw():
+            yield _entry(dic, ctx=self.ctx)
+
+    def __call__(self, *args: Any, **kwds: Any) -> Iterator["_entry"]:
+        return iter(self)
+
+    def __repr__(self) -> str:
+        return f"HarStream({self.filename!r})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
 
 
 def parse_costume(dic: Dict[str, Any]) -> Dict[str, Any]:
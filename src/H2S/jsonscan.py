@@ -0,0 +1,280 @@
+"""
+Incremental structural scanner for HAR documents.
+
+It never builds the whole JSON tree, it only finds where each value starts
+and ends so single values (an entry, a page, the creator object ...) can be
+handed to json.loads one at a time. Works over a file object read in chunks
+or over any complete buffer (bytes, mmap).
+"""
+
+import re
+import json
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, Sequence, Tuple
+
+_WS = re.compile(rb"[ \t\n\r]*")
+# body of a string, starting right after the opening quote, up to and including the closing one
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# everything up to the next bracket, whole strings included
+_SKIP = re.compile(rb'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.S)
+_SCALAR = re.compile(rb"[^,\]}\s]+")
+# objects and arrays nested this deep are matched by one regular expression
+DEPTH = 16
+
+
+def nested(depth: int) -> "re.Pattern[bytes] | None":
+    """
+    An object or array holding at most depth levels of brackets, matched by the
+    regex engine in one go. Possessive quantifiers (python 3.11+) keep a failed
+    match (a deeper or incomplete value) linear; None without them.
+    """
+    string = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+    level = rb'(?:[^"{}\[\]]++|' + string + rb")*+"
+    for _ in range(depth):
+        level = rb'(?:[^"{}\[\]]++|' + string + rb"|[{\[]" + level + rb"[}\]])*+"
+    try:
+        return re.compile(rb"[{\[]" + level + rb"[}\]]", re.S)
+    except re.error:
+        return None
+
+
+_NESTED = nested(DEPTH)
+
+_QUOTE, _OBJ, _END_OBJ, _ARR, _END_ARR = 0x22, 0x7B, 0x7D, 0x5B, 0x5D
+
+CHUNK_SIZE = 1 << 20
+
+
+def value_end(buf, pos: int) -> int:
+    """
+    Returns the index right after the JSON value starting at buf[pos],
+    or -1 when the value is not complete inside buf.
+    """
+    c = buf[pos]
+    if c == _QUOTE:
+        m = _STRING_TAIL.match(buf, pos + 1)
+        return m.end() if m else -1
+    if c == _OBJ or c == _ARR:
+        if _NESTED is not None:
+            m = _NESTED.match(buf, pos)
+            if m:
+                return m.end()
+        # deeper than DEPTH, not complete inside buf, or no possessive quantifiers: bracket by bracket
+        size = len(buf)
+        depth = 0
+        skip = _SKIP.match
+        while True:
+            pos = skip(buf, pos).end()
+            if pos >= size:
+                return -1
+            c = buf[pos]
+            if c == _QUOTE:
+                # an unterminated string
+                return -1
+            pos += 1
+            if c == _OBJ or c == _ARR:
+                depth += 1
+            else:
+                depth -= 1
+                if not depth:
+                    return pos
+    m = _SCALAR.match(buf, pos)
+    if not m or m.end() >= len(buf):
+        return -1
+    return m.end()
+
+
+class Reader:
+    """
+    Cursor over a growing window of a binary file.
+    buf holds the window, pos is relative to it and base is the absolute
+    offset of buf[0] in the file.
+    """
+
+    def __init__(self, fp: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf: Any = bytearray()
+        self.pos = 0
+        self.base = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            del self.buf[: self.pos]
+            self.base += self.pos
+            self.pos = 0
+        # read at least as much as is already buffered so a big value costs O(n)
+        data = self.fp.read(max(self.chunk_size, len(self.buf)))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> int:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of HAR document")
+
+    def expect(self, char: bytes) -> None:
+        if self.peek() != char[0]:
+            raise ValueError(f"Expected {char!r} at offset {self.base + self.pos}")
+        self.pos += 1
+
+    def span(self) -> Tuple[int, int]:
+        """Makes sure the next value is fully buffered and returns its relative span."""
+        self.peek()
+        while True:
+            end = value_end(self.buf, self.pos)
+            if end >= 0:
+                return self.pos, end
+            if not self.fill():
+                raise ValueError(f"Truncated value at offset {self.base + self.pos}")
+
+    def value(self) -> bytes:
+        start, end = self.span()
+        self.pos = end
+        return bytes(self.buf[start:end])
+
+    def skip(self) -> None:
+        self.pos = self.span()[1]
+
+    def members(self) -> Iterator[str]:
+        """Yields the keys of the object opened just before; the caller must consume each value."""
+        if self.peek() == _END_OBJ:
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != _QUOTE:
+                raise ValueError(f"Expected a key at offset {self.base + self.pos}")
+            key = json.loads(self.value())
+            self.expect(b":")
+            # the caller consumes the value here
+            yield key
+            c = self.peek()
+            self.pos += 1
+            if c == _END_OBJ:
+                return
+            if c != ord(","):
+                raise ValueError(f"Malformed object at offset {self.base + self.pos - 1}")
+
+    def elements(self) -> Iterator[Tuple[int, int]]:
+        """Yields absolute spans of the elements of the array opened just before."""
+        if self.peek() == _END_ARR:
+            self.pos += 1
+            return
+        while True:
+            start, end = self.span()
+            yield self.base + start, self.base + end
+            self.pos = end
+            c = self.peek()
+            self.pos += 1
+            if c == _END_ARR:
+                return
+            if c != ord(","):
+                raise ValueError(f"Malformed array at offset {self.base + self.pos - 1}")
+
+    def slice(self, start: int, end: int) -> bytes:
+        """Bytes of an absolute span which is still inside the window."""
+        return bytes(self.buf[start - self.base : end - self.base])
+
+
+class BufferReader(Reader):
+    """Reader over an already complete buffer (bytes, mmap); nothing is ever copied into a window."""
+
+    def __init__(self, buf) -> None:
+        self.fp = None
+        self.buf = buf
+        self.pos = 0
+        self.base = 0
+        self.eof = True
+
+    def fill(self) -> bool:
+        return False
+
+    def slice(self, start: int, end: int) -> bytes:
+        return self.buf[start:end]
+
+
+def iter_log(reader: Reader, arrays=("entries", "pages"), skip=()) -> Iterator[Tuple[str, int, int, bytes | None]]:
+    """
+    Walks the "log" object of a HAR document and yields
+    (key, start, end, raw) for every member of it. Members named in arrays
+    are yielded once per element instead of once as a whole. raw is None for
+    keys listed in skip, which are only scanned over.
+    """
+    reader.expect(b"{")
+    for key in reader.members():
+        if key != "log":
+            reader.skip()
+            continue
+        reader.expect(b"{")
+        for member in reader.members():
+            if member in arrays and reader.peek() == _ARR:
+                reader.pos += 1
+                for start, end in reader.elements():
+                    yield member, start, end, None if member in skip else reader.slice(start, end)
+            elif member in skip:
+                start, end = reader.span()
+                reader.pos = end
+                yield member, reader.base + start, reader.base + end, None
+            else:
+                start, end = reader.span()
+                reader.pos = end
+                yield member, reader.base + start, reader.base + end, reader.slice(reader.base + start, reader.base + end)
+        return
+    raise ValueError("File is empty or not a HAR file")
+
+
+class SpanList(Sequence):
+    """
+    Sequence of JSON values living at known byte spans of a buffer,
+    each item is decoded with json.loads (and object_hook) when it is asked for.
+    """
+
+    def __init__(self, buf, starts: array | None = None, ends: array | None = None) -> None:
+        self.buf = buf
+        self.object_hook = None
+        self.starts = starts if starts is not None else array("q")
+        self.ends = ends if ends is not None else array("q")
+
+    def append(self, start: int, end: int) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def span(self, index: int) -> Tuple[int, int]:
+        return self.starts[index], self.ends[index]
+
+    def raw(self, index: int) -> bytes:
+        return self.buf[self.starts[index] : self.ends[index]]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return json.loads(self.raw(index), object_hook=self.object_hook)
+
+
+def index_log(buf) -> Tuple[Dict[str, Any], SpanList, SpanList]:
+    """
+    One structural pass over a complete HAR buffer. Returns the decoded log
+    members except entries and pages, plus the spans of the entries and pages.
+    """
+    log: Dict[str, Any] = {}
+    entries, pages = SpanList(buf), SpanList(buf)
+    for key, start, end, raw in iter_log(BufferReader(buf), skip=("entries", "pages")):
+        if key == "entries":
+            entries.append(start, end)
+        elif key == "pages":
+            pages.append(start, end)
+        else:
+            log[key] = json.loads(raw)
+    return log, entries, pages
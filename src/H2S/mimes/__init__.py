@@ -0,0 +1,148 @@
+"""
+Registry of the IANA media types listed in the modules of this package.
+
+Lookups are case-insensitive and ignore parameters ("; charset=utf-8"), a
+structured syntax suffix (+json, +xml ...) is split off the subtype. Level
+compiles a {type: [subtypes]} table such as scraper.LOW into a predicate that
+remembers its answer for every mime string it has seen. The tables
+(application, audio ...) are only imported when the registry is first
+used or when they are accessed as attributes of this package.
+
+Examples:-
+>> essence("Text/HTML; charset=UTF-8")
+'text/html'
+>> parse("application/vnd.api+json")
+('application', 'vnd.api+json', 'json')
+>> lookup("application/3gpphal+json")
+'application/3gppHal+json'
+>> HIGH("application/ld+json")
+True
+"""
+
+from importlib import import_module
+from typing import Any, Dict, Iterable, List, Tuple
+
+TYPES = ("application", "audio", "font", "image", "message", "model", "multipart", "text", "video")
+
+_registry: Dict[str, str] = {}
+
+
+def __getattr__(name: str) -> Any:
+    if name in TYPES:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def essence(mime: str | None) -> str | None:
+    """type/subtype lower cased, parameters and whitespace dropped."""
+    if not isinstance(mime, str):
+        return None
+    return mime.partition(";")[0].strip().lower()
+
+
+def parse(mime: str | None) -> Tuple[str, str, str]:
+    """(type, subtype, structured suffix) of a mime type, empty strings for the missing parts."""
+    __type, _, subtype = (essence(mime) or "").partition("/")
+    return __type, subtype, subtype.rpartition("+")[2] if "+" in subtype else ""
+
+
+def registry() -> Dict[str, str]:
+    """Lower cased essence -> registered spelling of every known type, loaded on first use."""
+    if not _registry:
+        for name in TYPES:
+            for mime in import_module(f"{__name__}.{name}").types:
+                _registry[mime.lower()] = mime
+    return _registry
+
+
+def lookup(mime: str | None) -> str | None:
+    """The registered spelling of mime, None when it is not a registered type."""
+    return registry().get(essence(mime) or "")
+
+
+def known(mime: str | None) -> bool:
+    return lookup(mime) is not None
+
+
+def category(mime: str | None) -> str | None:
+    """Top level type of mime when it is one of TYPES."""
+    __type = parse(mime)[0]
+    return __type if __type in TYPES else None
+
+
+def is_json(mime: str | None) -> bool:
+    __type, subtype, suffix = parse(mime)
+    return subtype == "json" or suffix == "json"
+
+
+def is_xml(mime: str | None) -> bool:
+    __type, subtype, suffix = parse(mime)
+    return subtype == "xml" or suffix == "xml"
+
+
+class Level:
+    """
+    Predicate over mime types compiled from a {type: [subtypes]} table, "*"
+    accepting every subtype of a type. A subtype with a structured suffix is
+    also accepted through its suffix, application/ld+json by "json".
+
+    wildcards [set] - types accepted whatever the subtype.
+    subtypes [dict] - type -> accepted subtypes.
+    """
+
+    def __init__(self, table: Dict[str, Iterable[str]]) -> None:
+        self.table = table
+        self.wildcards = {i.lower() for i, v in table.items() if "*" in v}
+        self.subtypes = {i.lower(): {s.lower() for s in v} for i, v in table.items() if "*" not in v}
+        self.seen: Dict[str | None, bool] = {}
+
+    def match(self, mime: str | None) -> bool:
+        __type, subtype, suffix = parse(mime)
+        if __type in self.wildcards:
+            return True
+        accepted = self.subtypes.get(__type)
+        return bool(accepted) and (subtype in accepted or (suffix != "" and suffix in accepted))
+
+    def __call__(self, mime: str | None) -> bool:
+        try:
+            return self.seen[mime]
+        except KeyError:
+            result = self.seen[mime] = self.match(mime)
+            return result
+
+    def __repr__(self) -> str:
+        return f"Level({self.table})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+LOW = Level({"text": ["html"]})
+MID = Level({"multipart": ["form-data", "related"], "text": ["*"]})
+HIGH = Level(
+    {
+        "application": [
+            "javascript",
+            "x-javascript",
+            "json",
+            "xml",
+            "xhtml+xml",
+            "x-www-form-urlencoded",
+            "pgp",
+            "pgp-signature",
+            "x-perl",
+            "x-python",
+            "x-shellscript",
+            "yaml",
+        ],
+        "message": ["*"],
+        "multipart": ["*"],
+        "text": ["*"],
+    }
+)
+INSANE = Level({i: ["*"] for i in TYPES})
+
+
+def level(table: "Level | Dict[str, List]") -> Level:
+    """table compiled into a Level, unless it already is one."""
+    return table if isinstance(table, Level) else Level(table)
@@ -0,0 +1,246 @@
+"""
+Splitting one HAR file into many and merging many into one.
+
+Everything works on streamed entries (HarStream), no input is ever held in
+memory as a whole:
+    split - one file per pageref, per host, or per value of any key function.
+    shard - n files of about the same size, contiguous runs of entries copied
+            byte for byte, for parallel workers.
+    merge - one timeline ordered by startedDateTime, a k-way heap merge of
+            inputs that are each in time order; page ids used by more than one
+            input are renamed, with the pageref of their entries.
+
+Examples:-
+>> split("./huge.har", "./pages/", by="pageref")
+>> shard("./huge.har", "./shards/", 8)
+>> merge(["./a.har", "./b.har"], "./timeline.har")
+"""
+
+import os
+import re
+import math
+import heapq
+from collections import OrderedDict
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from .decoders import DecodeLimits
+from .h2s import HarStream, _Context
+from .query import timestamp, url_host
+from .writer import HarWriter
+
+# output files kept open at the same time by split
+MAX_OPEN = 64
+
+
+def started(dic: Dict[str, Any]) -> float:
+    """Sort key of a raw entry or page, its startedDateTime; missing or broken times come first."""
+    stamp = timestamp(dic.get("startedDateTime"))
+    return stamp if stamp == stamp else -math.inf
+
+
+def safe_name(key: Any) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(key)).strip("._") or "none"
+
+
+def stem(filename: str) -> str:
+    name = os.path.basename(filename)
+    for suffix in (".gz", ".bz2", ".xz", ".zip", ".har"):
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+    return name
+
+
+class Outputs:
+    """
+    One HarWriter per key, with at most max_open of their files open at a
+    time; the least recently used is closed and reopened for appending later.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str,
+        log: Callable[[Any], Dict[str, Any]],
+        bodies: str,
+        max_open: int,
+        ctx: _Context | None = None,
+    ) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.log = log
+        self.bodies = bodies
+        self.ctx = ctx
+        self.max_open = max(1, max_open)
+        self.paths: Dict[Any, str] = {}
+        self.writers: Dict[Any, HarWriter] = {}
+        self.open: "OrderedDict[Any, BinaryIO]" = OrderedDict()
+
+    def writer(self, key: Any) -> HarWriter:
+        __writer = self.writers.get(key)
+        if __writer is not None and key in self.open:
+            self.open.move_to_end(key)
+            return __writer
+        if len(self.open) >= self.max_open:
+            _, fp = self.open.popitem(last=False)
+            fp.close()
+        if __writer is None:
+            path = os.path.join(self.directory, f"{self.prefix}.{safe_name(key)}.har")
+            # two keys may clean up to the same name
+            count = 1
+            while path in self.paths.values():
+                count += 1
+                path = os.path.join(self.directory, f"{self.prefix}.{safe_name(key)}.{count}.har")
+            self.paths[key] = path
+            fp = open(path, "wb")
+            __writer = self.writers[key] = HarWriter(fp, self.log(key), self.bodies, self.ctx)
+        else:
+            fp = __writer.fp = open(self.paths[key], "ab")
+        self.open[key] = fp
+        return __writer
+
+    def close(self) -> Dict[Any, str]:
+        for key, __writer in self.writers.items():
+            if key not in self.open:
+                __writer.fp = open(self.paths[key], "ab")
+            __writer.close()
+            __writer.fp.close()
+        self.open.clear()
+        return self.paths
+
+
+def split(
+    filename: str,
+    directory: str,
+    by: str | Callable[[Dict[str, Any]], Any] = "pageref",
+    bodies: str = "keep",
+    max_open: int = MAX_OPEN,
+    limits: DecodeLimits | None = None,
+) -> Dict[Any, str]:
+    """
+    Writes the entries of filename to one file per key, in file order, and
+    returns key -> path. Files are named <name>.<key>.har inside directory.
+
+    by [string or callable] - "pageref", "host" (of the request url) or a function of the raw entry.
+    bodies [string] - see writer.HarWriter.
+    max_open [number] - output files open at the same time.
+    limits [DecodeLimits, optional] - bounds on the bodies decoded for bodies="decode" / "base64".
+
+    A pageref file holds its own page only, every other split keeps all the pages.
+    """
+    match by:
+        case "pageref":
+            key = lambda dic: dic.get("pageref")
+        case "host":
+            key = lambda dic: url_host((dic.get("request") or {}).get("url"))
+        case _ if callable(by):
+            key = by
+        case _:
+            raise ValueError(f"by must be 'pageref', 'host' or a function, not {by!r}")
+    ctx = _Context(limits)
+    stream = HarStream(filename, ctx=ctx)
+    header = stream.log
+    pages = {i.get("id"): i for i in header.get("pages") or ()}
+
+    def log(value: Any) -> Dict[str, Any]:
+        if by == "pageref":
+            return dict(header, pages=[pages[value]] if value in pages else [])
+        return header
+
+    os.makedirs(directory, exist_ok=True)
+    outputs = Outputs(directory, stem(filename), log, bodies, max_open, ctx)
+    try:
+        for dic in stream.raw():
+            outputs.writer(key(dic)).write(dic)
+    finally:
+        paths = outputs.close()
+    return paths
+
+
+def shard(filename: str, directory: str, n: int, bodies: str = "keep", limits: DecodeLimits | None = None) -> List[str]:
+    """
+    Cuts the entries of filename into n files of about the same number of bytes,
+    named <name>.<k>.har inside directory; every shard keeps all the pages.
+    The file is scanned twice, once for the size of every entry and once to
+    copy them. Returns the paths of the shards, fewer than n when there are
+    fewer entries. limits bounds the bodies decoded when bodies is not "keep".
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    ctx = _Context(limits)
+    stream = HarStream(filename, ctx=ctx)
+    sizes = array("q")
+    header: Dict[str, Any] = {}
+    for key, start, end, raw in stream.scan(skip=("entries",)):
+        if key == "entries":
+            sizes.append(end - start)
+        else:
+            stream.collect(key, raw, header)
+    total = sum(sizes)
+    os.makedirs(directory, exist_ok=True)
+    paths: List[str] = []
+    __writer: HarWriter | None = None
+    done = 0
+    position = 0
+    try:
+        for key, _, _, raw in stream.scan(skip=tuple(i for i in header if i != "entries")):
+            if key != "entries":
+                continue
+            # shard k takes the entries starting before k + 1 n-ths of the bytes
+            target = min(n - 1, done * n // total) if total else 0
+            if __writer is None or target >= len(paths):
+                if __writer is not None:
+                    __writer.close()
+                paths.append(os.path.join(directory, f"{stem(filename)}.{len(paths)}.har"))
+                __writer = HarWriter(paths[-1], header, bodies, ctx)
+            __writer.write(raw)
+            done += sizes[position]
+            position += 1
+    finally:
+        if __writer is not None:
+            __writer.close()
+    return paths
+
+
+def timeline(stream: HarStream, rename: Dict[str, str]) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    for dic in stream.raw():
+        if rename and dic.get("pageref") in rename:
+            dic["pageref"] = rename[dic["pageref"]]
+        yield started(dic), dic
+
+
+def merge(filenames: Iterable[str], target: str | BinaryIO, bodies: str = "keep", limits: DecodeLimits | None = None) -> int:
+    """
+    Writes the entries of every file to target as one timeline ordered by
+    startedDateTime, holding one entry per input at a time. Each input is
+    expected in time order (as browsers export them), entries with the same
+    time keep the order of the inputs. Returns the number of entries written.
+
+    The log header is the one of the first file, with the pages of every file
+    in time order; a page id already taken by an earlier file gets a "-<k>"
+    suffix, k being the position of its file. limits bounds each body decoded
+    when bodies is not "keep".
+    """
+    ctx = _Context(limits)
+    streams = [HarStream(i, ctx=ctx) for i in filenames]
+    pages: List[Dict[str, Any]] = []
+    taken: set = set()
+    renames: List[Dict[str, str]] = []
+    for k, stream in enumerate(streams):
+        rename: Dict[str, str] = {}
+        for page in stream.log.get("pages") or ():
+            __id = page.get("id")
+            if __id in taken:
+                new = f"{__id}-{k}"
+                while new in taken:
+                    new += f"-{k}"
+                rename[__id] = new
+                page = dict(page, id=new)
+            taken.add(page.get("id"))
+            pages.append(page)
+        renames.append(rename)
+    pages.sort(key=started)
+    header = dict(streams[0].log if streams else {}, pages=pages)
+    merged = heapq.merge(*(timeline(s, r) for s, r in zip(streams, renames)), key=lambda i: i[0])
+    with HarWriter(target, header, bodies, ctx) as __writer:
+        return __writer.write_all(dic for _, dic in merged)
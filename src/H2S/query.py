@@ -0,0 +1,196 @@
+"""
+Secondary indexes over the entries of a HAR file.
+
+The key fields of every entry (host, path, method, status, mime type) are read
+once into columns, from the sidecar index when the file has one, otherwise
+from the raw entries. Hash indexes on host/method/status/mime and a sorted
+index on the url path are built the first time a query needs them.
+
+Examples:-
+>> x = Har("./test.har")
+>> x.entries.find(host="api.example.com", status=range(500, 600))
+>> x.entries.find(method="POST", path="/graphql")
+>> x.entries.find(path_prefix="/static/", mime=["image/png", "image/webp"])
+"""
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence
+
+from .mimes import essence as mime_essence
+from .sidecar import scalar
+
+FIELDS = ("host", "path", "method", "status", "mime")
+
+
+def url_host(url: Any) -> str | None:
+    """Host part of an absolute url, without splitting the whole url."""
+    if not isinstance(url, str):
+        return None
+    start = url.find("//")
+    if start < 0:
+        return None
+    start += 2
+    end = len(url)
+    for sep in "/?#":
+        i = url.find(sep, start)
+        if 0 <= i < end:
+            end = i
+    __host = url[start:end].rpartition("@")[2]
+    if __host.startswith("["):
+        return __host[: __host.find("]") + 1].lower()
+    return __host.partition(":")[0].lower()
+
+
+def url_path(url: Any) -> str | None:
+    """Path part of an absolute url, "/" when it has none."""
+    if not isinstance(url, str):
+        return None
+    start = url.find("//")
+    start = url.find("/", start + 2) if start >= 0 else 0
+    if start < 0:
+        return "/"
+    end = len(url)
+    for sep in "?#":
+        i = url.find(sep, start)
+        if 0 <= i < end:
+            end = i
+    return url[start:end] or "/"
+
+
+def timestamp(value: Any) -> float:
+    """Seconds since the epoch of an ISO 8601 startedDateTime (UTC when it has no offset), NaN when it is not one."""
+    if not isinstance(value, str):
+        return math.nan
+    try:
+        # fromisoformat before 3.11 does not take a trailing Z
+        stamp = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return math.nan
+    return (stamp if stamp.tzinfo is not None else stamp.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def as_status(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def as_method(value: Any) -> str | None:
+    return value.upper() if isinstance(value, str) else None
+
+
+def key_columns(dics: Iterable[Dict[str, Any]] | None = None, index: Any = None) -> Dict[str, List[Any]]:
+    """The normalized key fields of every entry, from the sidecar index columns when there is one."""
+    if index is not None:
+        urls = index.column("request.url")
+        return {
+            "host": [url_host(i) for i in urls],
+            "path": [url_path(i) for i in urls],
+            "method": [as_method(i) for i in index.column("request.method")],
+            # NaN marks a missing status in the sidecar
+            "status": [as_status(i) if i == i else None for i in index.column("response.status")],
+            "mime": [mime_essence(i) for i in index.column("response.content.mimeType")],
+        }
+    columns: Dict[str, List[Any]] = {i: [] for i in FIELDS}
+    for dic in dics or ():
+        url = scalar(dic, "request.url")
+        columns["host"].append(url_host(url))
+        columns["path"].append(url_path(url))
+        columns["method"].append(as_method(scalar(dic, "request.method")))
+        columns["status"].append(as_status(scalar(dic, "response.status")))
+        columns["mime"].append(mime_essence(scalar(dic, "response.content.mimeType")))
+    return columns
+
+
+class Lookup:
+    """
+    columns [dict] - field -> normalized value of every entry.
+    hashes [dict] - field -> value -> positions, built on first use.
+    paths [tuple] - (sorted paths, their positions), built on first use.
+    """
+
+    def __init__(self, columns: Dict[str, List[Any]]) -> None:
+        self.columns = columns
+        self.hashes: Dict[str, Dict[Any, array]] = {}
+        self.paths: tuple | None = None
+
+    def __len__(self) -> int:
+        return len(self.columns["host"])
+
+    def hash(self, field: str) -> Dict[Any, array]:
+        __hash = self.hashes.get(field)
+        if __hash is None:
+            __hash = {}
+            for position, value in enumerate(self.columns[field]):
+                positions = __hash.get(value)
+                if positions is None:
+                    positions = __hash[value] = array("l")
+                positions.append(position)
+            self.hashes[field] = __hash
+        return __hash
+
+    def sorted_paths(self) -> tuple:
+        if self.paths is None:
+            column = self.columns["path"]
+            order = sorted((i for i in range(len(column)) if column[i] is not None), key=column.__getitem__)
+            self.paths = ([column[i] for i in order], array("l", order))
+        return self.paths
+
+    def path_range(self, low: str, high: str | None = None) -> Sequence[int]:
+        """Positions of the paths equal to low, or in [low, high) when high is given."""
+        keys, positions = self.sorted_paths()
+        start = bisect_left(keys, low)
+        end = bisect_right(keys, low) if high is None else bisect_left(keys, high)
+        return positions[start:end]
+
+    def positions(
+        self,
+        host: Any = None,
+        status: Any = None,
+        method: Any = None,
+        mime: Any = None,
+        path: str | None = None,
+        path_prefix: str | None = None,
+    ) -> List[int]:
+        """
+        Positions of the entries matching every given criterion. A criterion is a
+        single value or a collection of accepted values (e.g. status=range(500, 600)).
+        """
+        wanted: Dict[str, set] = {}
+        for field, value, normalize in (
+            ("host", host, str.lower),
+            ("status", status, int),
+            ("method", method, str.upper),
+            ("mime", mime, mime_essence),
+        ):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, (str, int)) else value
+            wanted[field] = {normalize(i) for i in values}
+
+        # candidates come from the most selective index, the other criteria are checked on the columns
+        candidates: List[Sequence[int]] = []
+        if path is not None:
+            candidates.append(self.path_range(path))
+        if path_prefix is not None:
+            candidates.append(self.path_range(path_prefix, path_prefix + "\U0010ffff"))
+        for field, values in wanted.items():
+            __hash = self.hash(field)
+            postings = [__hash[i] for i in values if i in __hash]
+            candidates.append(postings[0] if len(postings) == 1 else [i for p in postings for i in p])
+        if not candidates:
+            return list(range(len(self)))
+        checks = [(self.columns[i], v) for i, v in wanted.items()]
+        if path is not None:
+            checks.append((self.columns["path"], {path}))
+        __prefix = path_prefix or ""
+        __paths = self.columns["path"]
+        return sorted(
+            i
+            for i in min(candidates, key=len)
+            if all(column[i] in values for column, values in checks) and (__paths[i] or "").startswith(__prefix)
+        )
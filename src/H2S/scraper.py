@@ -1,8 +1,10 @@
 import os
 import logging
-from typing import List, Dict
-from bs4 import BeautifulSoup, Tag
-from h2s import Har, _entry, _Content, _Request
+from typing import Any, Dict, Iterable, List, Tuple
+from .decoders import optional
+from .h2s import Har, _entry, _Content, _Request
+from .mimes import HIGH, INSANE, LOW, MID, level
+from .search import body_text
 
 
 logging.basicConfig(
@@ -13,48 +15,23 @@ logger.setLevel(logging.DEBUG)
 logging.info("Initializing....")
 
 
-LOW: Dict[str, List] = {"text": ["html"]}
-MID: Dict[str, List] = {"multipart": ["form-data", "related"], "text": ["*"]}
-HIGH: Dict[str, List] = {
-    "application": [
-        "javascript",
-        "x-javascript",
-        "json",
-        "xml",
-        "xhtml+xml",
-        "x-www-form-urlencoded",
-        "pgp",
-        "pgp-signature",
-        "x-perl",
-        "x-python",
-        "x-shellscript",
-        "yaml",
-    ],
-    "message": ["*"],
-    "multipart": ["*"],
-    "text": ["*"],
-}
-INSANE: Dict[str, List] = {
-    "application": ["*"],
-    "audio": ["*"],
-    "font": ["*"],
-    "image": ["*"],
-    "message": ["*"],
-    "model": ["*"],
-    "multipart": ["*"],
-    "text": ["*"],
-    "video": ["*"],
-}
+LEVEL = LOW
 
 
-LEVEL = LOW
+def body(html) -> Any:
+    # bs4 and html5lib are slow to import, they are only loaded once a body gets parsed
+    bs4 = optional("bs4")
+    if bs4 is None:
+        raise ImportError("the scraper needs beautifulsoup4 and html5lib")
+    __body = bs4.BeautifulSoup(html, "html5lib").find("body")
+    assert isinstance(__body, bs4.Tag)
+    return __body
 
 
 class ParseJs:
     def __init__(self, html, text) -> None:
-        self.soup = BeautifulSoup(html, "html5lib").find("body")
+        self.soup = body(html)
         self.to_match = text
-        assert isinstance(self.soup, Tag)
         self.childs = self.soup.findChildren()
         self.matcher = []
         self.parseit()
@@ -65,9 +42,8 @@ class ParseJs:
 
 class ParseHTML:
     def __init__(self, html, text) -> None:
-        self.soup = BeautifulSoup(html, "html5lib").find("body")
+        self.soup = body(html)
         self.to_match = text
-        assert isinstance(self.soup, Tag)
         self.childs = self.soup.findChildren()
         self.matcher = []
         self.parseit()
@@ -81,7 +57,7 @@ class ParseHTML:
 
 
 def conAnalyzer(content: _Content, sample: str):
-    __cont = str(content.content)
+    __cont = body_text(content)
     if sample not in __cont:
         return None
     if content.mimeType == "text/html":
@@ -109,27 +85,43 @@ def resAnalyzer(entry: _entry, sample: str):
 
 def cleaner(entries: List[_entry]) -> List[_entry]:
     logging.info("Removing Unnecessary Entries...")
+    # LEVEL may also be a plain {type: [subtypes]} table
+    __level = level(LEVEL)
     __temp: List[_entry] = []
     for i in entries:
-        mime: str = str(i.response._content.mimeType)  # type/subtype
-        m_split = str(mime).split("/")
-        if (m_split[0] in LEVEL) and (m_split[-1] in LEVEL[m_split[0]] or LEVEL[m_split[0]][0] == "*"):
+        if i.response._content and __level(i.response._content.mimeType):
             __temp.append(i)
     return __temp
 
 
-def prepear(filename: str, sample: str):
+def prepear(filename: str, sample: str, cache: bool | str = False):
     if not os.path.exists(filename):
         raise FileNotFoundError("please double check the file name")
     _har = Har(filename=filename)
     sample = sample.strip()
     logging.info("Http Archive Extracted Sucessfully")
-    cleaned: List[_entry] = cleaner(_har.entries())
+    # only the entries whose body may hold the sample reach the exact check
+    candidates: List[_entry] = [_har.entries.entry(i) for i in _har.search_index(cache).candidates(sample)]
+    cleaned: List[_entry] = cleaner(candidates)
     operations = []
     for i in cleaned:
         operations.append(resAnalyzer(i, sample=sample))
     print(operations)
 
 
-LEVEL = HIGH
-prepear("test.har", "Fifty shades of neigh!")
+def prepear_many(filename: str, samples: Iterable[str], cache: bool | str = False) -> Dict[str, List[Tuple[_entry, List[int]]]]:
+    """Every sample located in one pass over each body, sample -> [(entry, offsets), ...] of the entries cleaner keeps."""
+    if not os.path.exists(filename):
+        raise FileNotFoundError("please double check the file name")
+    _har = Har(filename=filename)
+    logging.info("Http Archive Extracted Sucessfully")
+    found = _har.search_many([i.strip() for i in samples], cache)
+    for sample, matches in found.items():
+        kept = {id(i) for i in cleaner([entry for entry, _ in matches])}
+        found[sample] = [i for i in matches if id(i[0]) in kept]
+    return found
+
+
+if __name__ == "__main__":
+    LEVEL = HIGH
+    prepear("test.har", "Fifty shades of neigh!")
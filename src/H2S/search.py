@@ -0,0 +1,207 @@
+"""
+Trigram index over the response bodies of a HAR file.
+
+Every body is decoded once and the set of its 3 character substrings is
+recorded. A sample can only be in a body holding all of the sample's
+trigrams, so a search intersects a few posting lists and runs the exact
+"sample in body" check on the remaining candidates only. The index can be
+kept in a sidecar file next to the HAR and reused as long as the file does
+not change.
+
+Several samples are located at once with a Matcher, an Aho-Corasick
+automaton when pyahocorasick is installed, one compiled regular expression
+otherwise, so every candidate body is read a single time.
+
+Examples:-
+>> x = Har("./test.har")
+>> x.search("Fifty shades of neigh!")
+>> x.search_index(cache=True).candidates("session_id")
+>> x.search_many(["order-1234", "9.99", token])     # sample -> [(entry, offsets), ...]
+"""
+
+import os
+import re
+import json
+from array import array
+from typing import Any, Dict, Iterable, List, Set
+
+from .decoders import optional
+
+MAGIC = b"H2SBDY2\n"
+SUFFIX = ".h2sbody"
+GRAM = 3
+
+
+def body_text(content: Any) -> str:
+    """
+    The text a sample is searched in (and scraper.conAnalyzer looks at): the text
+    of the body as it is, a base64 body decoded as UTF-8 with the bytes that are
+    not UTF-8 kept as lone surrogates (surrogateescape). Offsets reported by a
+    search are indices into this text. Built on every call, never cached.
+    """
+    if not content:
+        return ""
+    __body = content.content
+    if __body is None:
+        return ""
+    if isinstance(__body, bytes):
+        return __body.decode("utf-8", "surrogateescape")
+    return __body
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class BodyIndex:
+    """
+    postings [dict] - trigram -> positions of the entries whose body contains it.
+    size [number] - number of indexed entries.
+    """
+
+    def __init__(self, postings: Dict[str, array], size: int) -> None:
+        self.postings = postings
+        self.size = size
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "BodyIndex":
+        """Index of the body texts of the entries, in entry order (see Har.body_texts)."""
+        postings: Dict[str, array] = {}
+        size = 0
+        for position, text in enumerate(texts):
+            size += 1
+            for gram in trigrams(text):
+                positions = postings.get(gram)
+                if positions is None:
+                    positions = postings[gram] = array("l")
+                positions.append(position)
+        return cls(postings, size)
+
+    def candidates(self, sample: str) -> List[int]:
+        """
+        Positions of the entries whose body may contain sample, in order. Samples
+        shorter than a trigram can not be narrowed down, every position is returned.
+        """
+        grams = trigrams(sample)
+        if not grams:
+            return list(range(self.size))
+        lists = []
+        for gram in grams:
+            positions = self.postings.get(gram)
+            if positions is None:
+                return []
+            lists.append(positions)
+        lists.sort(key=len)
+        found = set(lists[0])
+        for positions in lists[1:]:
+            found.intersection_update(positions)
+            if not found:
+                return []
+        return sorted(found)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def save(self, path: str, key: Dict[str, Any]) -> None:
+        """Same layout as sidecar.EntryIndex: MAGIC | header length | header json | arrays."""
+        grams = list(self.postings)
+        header = json.dumps(
+            {
+                "key": key,
+                "size": self.size,
+                "typecode": "l",
+                "grams": [[i, len(self.postings[i])] for i in grams],
+            }
+        ).encode()
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as fp:
+            fp.write(MAGIC)
+            fp.write(len(header).to_bytes(8, "little"))
+            fp.write(header)
+            for gram in grams:
+                self.postings[gram].tofile(fp)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path: str, key: Dict[str, Any]) -> "BodyIndex | None":
+        """The index stored at path when it was made for the file identified by key, None otherwise."""
+        try:
+            with open(path, "rb") as fp:
+                if fp.read(len(MAGIC)) != MAGIC:
+                    return None
+                header = json.loads(fp.read(int.from_bytes(fp.read(8), "little")))
+                if header["key"] != key:
+                    return None
+                postings: Dict[str, array] = {}
+                for gram, length in header["grams"]:
+                    positions = array(header["typecode"])
+                    positions.fromfile(fp, length)
+                    postings[gram] = positions
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+        return cls(postings, header["size"])
+
+    def __repr__(self) -> str:
+        return f"BodyIndex({self.size} entries, {len(self.postings)} trigrams)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+class Matcher:
+    """
+    Every occurrence of several samples in one pass over a text.
+
+    samples [array] - the distinct, non empty samples.
+    automaton [object] - ahocorasick.Automaton over the samples, None without pyahocorasick.
+    pattern [re.Pattern] - fallback, a lookahead alternation reporting one
+                           (the longest) sample per position, see find.
+    prefixes [dict] - sample -> the other samples it starts with.
+    """
+
+    def __init__(self, samples: Iterable[str]) -> None:
+        self.samples: List[str] = list(dict.fromkeys(i for i in samples if i))
+        self.automaton = None
+        self.pattern = None
+        self.prefixes: Dict[str, List[str]] = {}
+        ahocorasick = optional("ahocorasick")
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for sample in self.samples:
+                self.automaton.add_word(sample, sample)
+            if self.samples:
+                self.automaton.make_automaton()
+            return
+        __longest = sorted(self.samples, key=len, reverse=True)
+        if __longest:
+            # zero width, so overlapping occurrences are all found
+            self.pattern = re.compile("(?=(" + "|".join(re.escape(i) for i in __longest) + "))")
+        # a sample matching where a longer one matched is one of its prefixes
+        self.prefixes = {i: [v for v in self.samples if v != i and i.startswith(v)] for i in self.samples}
+
+    def find(self, text: str) -> Dict[str, List[int]]:
+        """Sample -> start offsets of its occurrences in text, samples not found are left out."""
+        found: Dict[str, List[int]] = {}
+        if self.automaton is not None:
+            if self.samples:
+                for end, sample in self.automaton.iter(text):
+                    found.setdefault(sample, []).append(end - len(sample) + 1)
+            return found
+        if self.pattern is None:
+            return found
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            sample = match.group(1)
+            found.setdefault(sample, []).append(start)
+            for prefix in self.prefixes[sample]:
+                found.setdefault(prefix, []).append(start)
+        return found
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __repr__(self) -> str:
+        return f"Matcher({len(self.samples)} samples, {'aho-corasick' if self.automaton is not None else 'regex'})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
@@ -0,0 +1,192 @@
+"""
+On disk index cache for HAR files.
+
+The first open of a file records the byte span of every entry and page plus
+the scalar fields of every entry (url, method, status, sizes, timings ...,
+every column of an EntryTable) and writes them next to the file. Later opens
+of the same, unchanged file read that sidecar instead of scanning the JSON.
+
+Layout of a sidecar file:-
+    MAGIC | header length (8 bytes, little endian) | header json | arrays
+The header names every array stored after it, in order, with its typecode
+and length. String columns live in the header itself.
+"""
+
+import os
+import sys
+import json
+import math
+from array import array
+from hashlib import blake2b
+from typing import Any, Dict, List, Tuple
+
+from .jsonscan import SpanList
+
+MAGIC = b"H2SIDX2\n"
+SUFFIX = ".h2sidx"
+# bytes hashed at the start and at the end of the file
+HASH_SAMPLE = 1 << 20
+
+# every column of table.EntryTable, so the table of an indexed file never decodes an entry
+STRING_FIELDS = (
+    "startedDateTime",
+    "pageref",
+    "serverIPAddress",
+    "connection",
+    "request.method",
+    "request.url",
+    "request.httpVersion",
+    "response.statusText",
+    "response.httpVersion",
+    "response.redirectURL",
+    "response.content.mimeType",
+)
+NUMBER_FIELDS = (
+    "time",
+    "request.headersSize",
+    "request.bodySize",
+    "response.status",
+    "response.headersSize",
+    "response.bodySize",
+    "response.content.size",
+    "response.content.compression",
+    "timings.blocked",
+    "timings.dns",
+    "timings.connect",
+    "timings.ssl",
+    "timings.send",
+    "timings.wait",
+    "timings.receive",
+)
+
+
+def scalar(dic: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted path of a raw entry, None when any part is missing."""
+    for part in path.split("."):
+        if not isinstance(dic, dict):
+            return None
+        dic = dic.get(part)
+    return dic
+
+
+def number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def file_key(filename: str) -> Dict[str, Any]:
+    """
+    Identity of a file: path, size, mtime and a hash of its first and last
+    HASH_SAMPLE bytes (hashing a multi GB file on every open would cost more
+    than the scan the cache saves).
+    """
+    stat = os.stat(filename)
+    digest = blake2b(digest_size=16)
+    with open(filename, "rb") as fp:
+        digest.update(fp.read(HASH_SAMPLE))
+        if stat.st_size > HASH_SAMPLE:
+            fp.seek(max(HASH_SAMPLE, stat.st_size - HASH_SAMPLE))
+            digest.update(fp.read(HASH_SAMPLE))
+    return {
+        "path": os.path.abspath(filename),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": digest.hexdigest(),
+        "byteorder": sys.byteorder,
+    }
+
+
+def sidecar_path(filename: str, cache_dir: str | None = None, suffix: str = SUFFIX) -> str:
+    if not cache_dir:
+        return filename + suffix
+    name = blake2b(os.path.abspath(filename).encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, name + suffix)
+
+
+class EntryIndex:
+    """
+    Byte spans and precomputed scalar columns of the entries of one file.
+
+    entries [SpanList] - spans of log.entries, decoded on demand.
+    pages [SpanList] - spans of log.pages, decoded on demand.
+    log [object] - the other members of log (version, creator, browser ...).
+    columns [dict] - dotted field name -> list (strings) or array("d") (numbers, NaN when missing).
+    """
+
+    def __init__(self, log: Dict[str, Any], entries: SpanList, pages: SpanList, columns: Dict[str, Any]) -> None:
+        self.log = log
+        self.entries = entries
+        self.pages = pages
+        self.columns = columns
+
+    @classmethod
+    def build(cls, log: Dict[str, Any], entries: SpanList, pages: SpanList) -> "EntryIndex":
+        columns: Dict[str, Any] = {i: [] for i in STRING_FIELDS}
+        columns.update({i: array("d") for i in NUMBER_FIELDS})
+        for i in range(len(entries)):
+            dic = entries[i]
+            for field in STRING_FIELDS:
+                columns[field].append(scalar(dic, field))
+            for field in NUMBER_FIELDS:
+                columns[field].append(number(scalar(dic, field)))
+        return cls(log, entries, pages, columns)
+
+    def column(self, name: str) -> List[Any] | array:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self, path: str, key: Dict[str, Any]) -> None:
+        arrays: List[Tuple[str, array]] = [
+            ("entries.starts", self.entries.starts),
+            ("entries.ends", self.entries.ends),
+            ("pages.starts", self.pages.starts),
+            ("pages.ends", self.pages.ends),
+        ]
+        arrays += [(i, v) for i, v in self.columns.items() if isinstance(v, array)]
+        header = json.dumps(
+            {
+                "key": key,
+                "log": self.log,
+                "strings": {i: v for i, v in self.columns.items() if not isinstance(v, array)},
+                "arrays": [[i, v.typecode, len(v)] for i, v in arrays],
+            }
+        ).encode()
+        # write to a temporary name first so a reader never sees half a sidecar
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as fp:
+            fp.write(MAGIC)
+            fp.write(len(header).to_bytes(8, "little"))
+            fp.write(header)
+            for _, values in arrays:
+                values.tofile(fp)
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path: str, key: Dict[str, Any], buf) -> "EntryIndex | None":
+        """The index stored at path when it was made for the file identified by key, None otherwise."""
+        try:
+            with open(path, "rb") as fp:
+                if fp.read(len(MAGIC)) != MAGIC:
+                    return None
+                header = json.loads(fp.read(int.from_bytes(fp.read(8), "little")))
+                if header["key"] != key:
+                    return None
+                arrays: Dict[str, array] = {}
+                for name, typecode, length in header["arrays"]:
+                    values = array(typecode)
+                    values.fromfile(fp, length)
+                    arrays[name] = values
+        except (OSError, ValueError, KeyError, EOFError):
+            return None
+        entries = SpanList(buf, arrays.pop("entries.starts"), arrays.pop("entries.ends"))
+        pages = SpanList(buf, arrays.pop("pages.starts"), arrays.pop("pages.ends"))
+        columns: Dict[str, Any] = dict(header["strings"])
+        columns.update(arrays)
+        return cls(header["log"], entries, pages, columns)
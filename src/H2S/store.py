@@ -0,0 +1,118 @@
+"""
+Content addressed store for decoded response bodies.
+
+Bodies are keyed by a blake2b hash of their bytes and kept once, every
+_Content decoding to the same body holds the same object. One store can be
+shared by several Har objects (see HarCorpus.open) so bundles, fonts and
+images repeated across pages and files are only resident once. The store
+does not keep bodies alive: a body is released with the last _Content
+holding it, so a long lived corpus store only holds the bodies of the Har
+objects still in use.
+
+Examples:-
+>> store = BodyStore()
+>> a = Har("./a.har", store=store)
+>> b = Har("./b.har", store=store)
+>> a.decode_all(); b.decode_all()
+>> store.stats()
+"""
+
+import sys
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Dict
+from weakref import WeakValueDictionary, finalize
+
+
+class StoredBody:
+    """
+    The kept copy of a body. The store only refers to it weakly, it lives as
+    long as a _Content holds it and the store forgets the body after that.
+
+    value [string or bytes] - the body.
+    refs [number] - number of live holders that resolved to it.
+    """
+
+    __slots__ = ("value", "refs", "__weakref__")
+
+    def __init__(self, value: str | bytes) -> None:
+        self.value = value
+        self.refs = 0
+
+
+class BodyStore:
+    """
+    bodies [WeakValueDictionary] - hash -> StoredBody of every body still held by a _Content.
+    """
+
+    def __init__(self) -> None:
+        self.bodies: "WeakValueDictionary[bytes, StoredBody]" = WeakValueDictionary()
+        self.lock = Lock()
+
+    @staticmethod
+    def key(body: str | bytes) -> bytes:
+        # str and bytes of the same characters are different bodies
+        if isinstance(body, str):
+            return b"s" + blake2b(body.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        return b"b" + blake2b(body, digest_size=16).digest()
+
+    def put(self, body: str | bytes, holder: object) -> StoredBody:
+        """
+        The StoredBody of body, a new one when the body is not held yet; holder
+        keeps it as long as the body is used and gives its reference back when
+        it is collected.
+        """
+        key = self.key(body)
+        with self.lock:
+            stored = self.bodies.get(key)
+            if stored is None:
+                stored = self.bodies[key] = StoredBody(body)
+            stored.refs += 1
+        finalize(holder, self.release, stored)
+        return stored
+
+    def release(self, stored: StoredBody) -> None:
+        with self.lock:
+            stored.refs -= 1
+
+    def get(self, key: bytes) -> str | bytes | None:
+        stored = self.bodies.get(key)
+        return stored.value if stored is not None else None
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self.bodies
+
+    def __len__(self) -> int:
+        return len(self.bodies)
+
+    @property
+    def stored(self) -> int:
+        """Bytes the kept bodies take."""
+        return sum(sys.getsizeof(i.value) for i in list(self.bodies.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counts over the bodies still held; references and logical (the bytes all
+        the references would take without deduplication) only count live holders.
+        """
+        __bodies = list(self.bodies.values())
+        stored = sum(sys.getsizeof(i.value) for i in __bodies)
+        logical = sum(sys.getsizeof(i.value) * i.refs for i in __bodies)
+        return {
+            "bodies": len(__bodies),
+            "references": sum(i.refs for i in __bodies),
+            "stored": stored,
+            "logical": logical,
+            "ratio": logical / stored if stored else 1.0,
+        }
+
+    def clear(self) -> None:
+        """Forgets every body, the _Content holding one keep their copy."""
+        with self.lock:
+            self.bodies.clear()
+
+    def __repr__(self) -> str:
+        return f"BodyStore({len(self.bodies)} bodies)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
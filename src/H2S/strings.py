@@ -0,0 +1,87 @@
+"""
+Interning of the string values that repeat all over a HAR file.
+
+json creates a new str for every value it reads, so "GET", "HTTP/1.1",
+"text/html; charset=utf-8", every header name, common header values, cookie
+names ... exist once per entry. StringTable.hook is an object_hook for json
+which swaps those values for one shared copy while the file is decoded.
+
+Examples:-
+>> x = Har("./test.har", intern=True)
+>> x.ctx.strings.stats()
+{'strings': 1830, 'hits': 412345, 'saved': 25678901}
+"""
+
+import sys
+from typing import Any, Dict
+
+# members whose string values are interned
+KEYS = frozenset(
+    (
+        "name",
+        "value",
+        "method",
+        "httpVersion",
+        "mimeType",
+        "statusText",
+        "pageref",
+        "serverIPAddress",
+        "connection",
+        "domain",
+        "path",
+        "expires",
+        "encoding",
+        "redirectURL",
+    )
+)
+# longer values are close to always unique (tokens, urls, bodies), they only grow the table
+MAX_LENGTH = 256
+
+
+class StringTable:
+    """
+    strings [dict] - the shared copy of every interned value.
+    hits [number] - values replaced by an already shared copy.
+    saved [number] - bytes of the replaced values, freed once the decoder drops them.
+    """
+
+    def __init__(self, keys: frozenset = KEYS, max_length: int = MAX_LENGTH) -> None:
+        self.keys = keys
+        self.max_length = max_length
+        self.strings: Dict[str, str] = {}
+        self.hits = 0
+        self.saved = 0
+
+    def intern(self, value: str) -> str:
+        shared = self.strings.setdefault(value, value)
+        if shared is not value:
+            self.hits += 1
+            self.saved += sys.getsizeof(value)
+        return shared
+
+    def hook(self, dic: Dict[str, Any]) -> Dict[str, Any]:
+        """object_hook for json.load / json.loads."""
+        keys = self.keys
+        max_length = self.max_length
+        strings = self.strings
+        for key, value in dic.items():
+            if key in keys and value.__class__ is str and len(value) <= max_length:
+                shared = strings.setdefault(value, value)
+                if shared is not value:
+                    # replacing the value of an existing key does not disturb the iteration
+                    dic[key] = shared
+                    self.hits += 1
+                    self.saved += sys.getsizeof(value)
+        return dic
+
+    def stats(self) -> Dict[str, int]:
+        return {"strings": len(self.strings), "hits": self.hits, "saved": self.saved}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __repr__(self) -> str:
+        return f"StringTable({len(self.strings)} strings, {self.saved} bytes saved)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
@@ -0,0 +1,169 @@
+"""
+Columnar view over the entries of a HAR file.
+
+Every scalar field of an entry (and of its request, response, content and
+timings) becomes one column. Number columns are array("d") or, when NumPy is
+installed, float64 ndarrays; missing numbers are NaN. String columns are lists
+or object ndarrays. Columns are named by their dotted path in the entry,
+e.g. "response.status" or "timings.wait".
+
+Examples:-
+>> t = Har("./test.har").table()
+>> t.percentile("timings.wait", 90)
+>> t.filter(t["response.status"] >= 500)        # with NumPy
+>> t.groupby("request.method")
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Sequence
+
+from .sidecar import NUMBER_FIELDS, STRING_FIELDS, number, scalar
+
+# the fields a sidecar keeps, a table of an indexed file is built from it alone
+STRING_COLUMNS = STRING_FIELDS
+NUMBER_COLUMNS = NUMBER_FIELDS
+
+_numpy: Any = False
+
+
+def numpy():
+    """The numpy module, or None when it is not installed."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
+
+
+class EntryTable:
+    """
+    columns [dict] - column name -> column, all of the same length.
+    """
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        self.columns = columns
+
+    @classmethod
+    def from_raw(cls, dics: Iterable[Dict[str, Any]], index: Any = None) -> "EntryTable":
+        """
+        Builds the table from raw entry dicts. Columns already present in index
+        (a sidecar.EntryIndex) are taken from it instead.
+        """
+        known = {i: index.column(i) for i in STRING_COLUMNS + NUMBER_COLUMNS if index is not None and i in index}
+        strings = {i: [] for i in STRING_COLUMNS if i not in known}
+        numbers = {i: array("d") for i in NUMBER_COLUMNS if i not in known}
+        if strings or numbers:
+            for dic in dics:
+                for name, column in strings.items():
+                    column.append(scalar(dic, name))
+                for name, column in numbers.items():
+                    column.append(number(scalar(dic, name)))
+        columns = {**known, **strings, **numbers}
+        return cls({i: cls.convert(columns[i], i in NUMBER_COLUMNS) for i in STRING_COLUMNS + NUMBER_COLUMNS})
+
+    @staticmethod
+    def convert(column: Sequence[Any], numeric: bool) -> Any:
+        np = numpy()
+        if np is None:
+            return array("d", column) if numeric else list(column)
+        if numeric:
+            return np.frombuffer(column, dtype=np.float64).copy() if isinstance(column, array) else np.asarray(column, dtype=np.float64)
+        __column = np.empty(len(column), dtype=object)
+        __column[:] = column
+        return __column
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __repr__(self) -> str:
+        return f"EntryTable({len(self)} rows x {len(self.columns)} columns)"
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    def take(self, indices: Sequence[int]) -> "EntryTable":
+        np = numpy()
+        if np is not None:
+            __indices = np.asarray(indices, dtype=np.intp)
+            return EntryTable({i: v[__indices] for i, v in self.columns.items()})
+        return EntryTable(
+            {i: (array("d", (v[j] for j in indices)) if isinstance(v, array) else [v[j] for j in indices]) for i, v in self.columns.items()}
+        )
+
+    def filter(self, mask: Sequence[bool]) -> "EntryTable":
+        np = numpy()
+        if np is not None:
+            __mask = np.asarray(mask, dtype=bool)
+            return EntryTable({i: v[__mask] for i, v in self.columns.items()})
+        return self.take([i for i, keep in enumerate(mask) if keep])
+
+    def groups(self, name: str) -> Dict[Any, Sequence[int]]:
+        """Row indices of every distinct value of a column."""
+        column = self.columns[name]
+        np = numpy()
+        if np is not None and len(column):
+            keys = column.astype(str) if column.dtype == object else column
+            values, inverse = np.unique(keys, return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+            return {column[rows[0]]: rows for rows in np.split(order, bounds)}
+        __groups: Dict[Any, List[int]] = {}
+        for i, value in enumerate(column):
+            __groups.setdefault(value, []).append(i)
+        return __groups
+
+    def groupby(self, name: str) -> Dict[Any, "EntryTable"]:
+        return {value: self.take(rows) for value, rows in self.groups(name).items()}
+
+    def values(self, name: str) -> Any:
+        """The number column without its NaN (missing) values."""
+        column = self.columns[name]
+        np = numpy()
+        if np is not None:
+            return column[~np.isnan(column)]
+        return array("d", (i for i in column if not math.isnan(i)))
+
+    def sum(self, name: str) -> float:
+        __values = self.values(name)
+        np = numpy()
+        return float(np.sum(__values)) if np is not None else math.fsum(__values)
+
+    def mean(self, name: str) -> float:
+        __values = self.values(name)
+        return self.sum(name) / len(__values) if len(__values) else math.nan
+
+    def percentile(self, name: str, q: float | Sequence[float]) -> Any:
+        """Linear interpolated percentile(s) of a number column, NaN values ignored."""
+        __values = self.values(name)
+        np = numpy()
+        if np is not None:
+            if not len(__values):
+                return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+            return np.percentile(__values, q)
+        return percentile(sorted(__values), q)
+
+
+def percentile(ordered: Sequence[float], q: float | Sequence[float]) -> Any:
+    """Percentile(s) of already sorted values, interpolated like numpy.percentile."""
+    if not isinstance(q, (int, float)):
+        return [percentile(ordered, i) for i in q]
+    if not ordered:
+        return math.nan
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
@@ -0,0 +1,155 @@
+"""
+Streaming writer for HAR files.
+
+The log header (version, creator, browser, pages, comment ...) is written
+first, then every entry is serialized and written as soon as it is handed
+over, so a subset of a capture of any size is written in constant memory.
+Entries can be _entry objects, raw dicts or the raw JSON bytes of an entry
+(SpanList.raw); the bytes are copied untouched when the bodies are kept.
+
+bodies [string] - what happens to response.content.text:
+    "keep"    - written as in the source.
+    "drop"    - text and encoding left out, size and mimeType kept.
+    "decode"  - base64 and the content-encoding undone, written as text when
+                the body is valid UTF-8, as base64 otherwise.
+    "base64"  - the decoded body, always base64.
+
+Examples:-
+>> x = Har("./huge.har", mmap=True)
+>> with HarWriter("./api.har", x.log, bodies="drop") as writer:
+>>     writer.write_all(x.entries.find(host="api.example.com"))
+>> x.write("./copy.har", bodies="decode")
+"""
+
+import json
+from base64 import standard_b64encode
+from typing import Any, BinaryIO, Dict, Iterable
+
+from .h2s import _Content, _Context
+from .jsonscan import SpanList
+
+BODIES = ("keep", "drop", "decode", "base64")
+
+
+def dumps(value: Any) -> bytes:
+    try:
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+    except UnicodeEncodeError:
+        # lone surrogates can only be written escaped
+        return json.dumps(value).encode("ascii")
+
+
+def recode(dic: Dict[str, Any], bodies: str, ctx: _Context | None = None) -> Dict[str, Any]:
+    """
+    Copy of a raw entry with its response body dropped or re-encoded, the source
+    is left untouched. The body is decoded under the body and ratio limits of
+    ctx (not its budget), cut at a bound (or LimitExceeded raised) like
+    _Content.decompress, and not kept once written.
+    """
+    response = dic.get("response")
+    content = response.get("content") if isinstance(response, dict) else None
+    if not isinstance(content, dict) or content.get("text") is None:
+        return dic
+    __content = {i: v for i, v in content.items() if i not in ("text", "encoding")}
+    if bodies != "drop":
+        __source = _Content.transient(dic, ctx)
+        if __source is None:
+            # unknown encoding, nothing to decode it with
+            return dic
+        body = __source.body()
+        text = None
+        if bodies == "decode":
+            try:
+                text = body.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        if text is None:
+            __content["text"] = standard_b64encode(body).decode("ascii")
+            __content["encoding"] = "base64"
+        else:
+            __content["text"] = text
+    return dict(dic, response=dict(response, content=__content))
+
+
+class HarWriter:
+    """
+    target [string or binary file] - file name, or an open binary file object
+                                     (e.g. gzip.open(name, "wb")) left open on close.
+    log [object, optional] - members of log written before the entries; "entries" is ignored.
+    bodies [string] - "keep", "drop", "decode" or "base64", see the module docstring.
+    ctx [_Context, optional] - context of the Har the entries come from (Har.ctx), its
+                               DecodeLimits bound the bodies decoded for writing.
+    count [number] - entries written so far.
+    """
+
+    def __init__(
+        self,
+        target: str | BinaryIO,
+        log: Dict[str, Any] | None = None,
+        bodies: str = "keep",
+        ctx: _Context | None = None,
+    ) -> None:
+        if bodies not in BODIES:
+            raise ValueError(f"bodies must be one of {BODIES}, not {bodies!r}")
+        self.bodies = bodies
+        self.ctx = ctx
+        self.owned = isinstance(target, str)
+        self.fp: BinaryIO = open(target, "wb") if isinstance(target, str) else target
+        self.count = 0
+        self.closed = False
+        self.fp.write(b'{"log": {')
+        for key, value in (log or {"version": "1.2", "creator": {"name": "H2S", "version": ""}}).items():
+            if key == "entries":
+                continue
+            self.fp.write(dumps(key) + b": ")
+            if isinstance(value, SpanList):
+                # pages of a mapped file, copied as they are
+                self.fp.write(b"[" + b", ".join(value.raw(i) for i in range(len(value))) + b"]")
+            else:
+                self.fp.write(dumps(value))
+            self.fp.write(b", ")
+        self.fp.write(b'"entries": [')
+
+    def write(self, entry: Any) -> None:
+        """Writes one entry: an _entry, a raw dict or the raw JSON bytes of one."""
+        if self.closed:
+            raise ValueError("write to a closed HarWriter")
+        if not isinstance(entry, (dict, bytes, bytearray, memoryview)):
+            entry = entry.raw
+        if self.bodies != "keep" and not isinstance(entry, dict):
+            entry = json.loads(entry)
+        if isinstance(entry, dict):
+            entry = dumps(recode(entry, self.bodies, self.ctx) if self.bodies != "keep" else entry)
+        if self.count:
+            self.fp.write(b", ")
+        self.fp.write(entry)
+        self.count += 1
+
+    def write_all(self, entries: Iterable[Any]) -> int:
+        """Writes every entry of an iterable, returns how many were written."""
+        __count = self.count
+        for entry in entries:
+            self.write(entry)
+        return self.count - __count
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.fp.write(b"]}}")
+        self.closed = True
+        if self.owned:
+            self.fp.close()
+        else:
+            self.fp.flush()
+
+    def __enter__(self) -> "HarWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"HarWriter({self.count} entries, bodies={self.bodies!r})"
+
+    def __str__(self) -> str:
+        return self.__repr__()
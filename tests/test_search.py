@@ -0,0 +1,42 @@
+import base64
+import gzip
+import json
+
+from H2S.decoders import DecodeLimits
+from H2S.h2s import Har
+
+BODY = b"needle " + bytes(range(256)).hex().encode() * 19
+
+
+def write_har(path, count=200):
+    entry = {
+        "request": {"method": "GET", "url": "http://example.com/"},
+        "response": {
+            "status": 200,
+            "headers": [{"name": "content-encoding", "value": "gzip"}],
+            "content": {
+                "size": len(BODY),
+                "mimeType": "text/plain",
+                "text": base64.b64encode(gzip.compress(BODY)).decode(),
+                "encoding": "base64",
+            },
+        },
+    }
+    log = {"version": "1.2", "creator": {"name": "test", "version": "1"}, "entries": [entry] * count}
+    path.write_text(json.dumps({"log": log}))
+    return str(path)
+
+
+def test_search_under_total_limit(tmp_path):
+    # the bodies fit the budget once, building the index must not take them from it again
+    har = Har(write_har(tmp_path / "a.har"), limits=DecodeLimits(total=2_500_000))
+    har.search_index()
+    assert len(har.search("needle")) == 200
+    assert not any(har.entries[i].response._content.truncated for i in range(200))
+    assert all(har.entries[i].response.content == BODY for i in range(200))
+
+
+def test_search_many_under_total_limit(tmp_path):
+    har = Har(write_har(tmp_path / "a.har"), limits=DecodeLimits(total=2_500_000))
+    assert len(har.search_many(["needle"])["needle"]) == 200
+    assert not any(har.entries[i].response._content.truncated for i in range(200))